@@ -1,13 +1,9 @@
 load("//buck2:verilator_sim.bzl", "VerilatorModelInfo")
 
-def _cocotb_test_impl(ctx: AnalysisContext) -> list[Provider]:
-    model_info = ctx.attrs.model[VerilatorModelInfo]
-
+# Links the Verilated model against cocotb's VPI entry point into a Vtop executable.
+def _link_vtop(ctx: AnalysisContext, model_info) -> Artifact:
     vtop = ctx.actions.declare_output("Vtop")
-    results_xml = ctx.actions.declare_output("results.xml")
-    dump_fst = ctx.actions.declare_output("dump.fst")
 
-    # ── Link action ──────────────────────────────────────────────────────────
     runtime_cpps = [
         "$VERILATOR_ROOT/include/verilated.cpp",
         "$VERILATOR_ROOT/include/verilated_vpi.cpp",
@@ -17,7 +13,7 @@ def _cocotb_test_impl(ctx: AnalysisContext) -> list[Provider]:
         runtime_cpps.append("$VERILATOR_ROOT/include/verilated_fst_c.cpp")
 
     link_args = [
-        "g++", "-std=c++17", "-O2", "-o", vtop.as_output(),
+        "g++", "-std=c++17", "-O2", "-pthread", "-o", vtop.as_output(),
         cmd_args("-I", model_info.include_dir, delimiter = ""),
         "-I$VERILATOR_ROOT/include",
         "-I$VERILATOR_ROOT/include/vltstd",
@@ -45,7 +41,10 @@ def _cocotb_test_impl(ctx: AnalysisContext) -> list[Provider]:
         category = "verilator_link",
     )
 
-    # ── Test-run action ───────────────────────────────────────────────────────
+    return vtop
+
+# Environment for running Vtop with the given cocotb test module.
+def _cocotb_env_lines(ctx: AnalysisContext, model_info, test_module) -> list:
     python_path = ":".join(ctx.attrs.python_path)
 
     env_lines = []
@@ -55,7 +54,7 @@ def _cocotb_test_impl(ctx: AnalysisContext) -> list[Provider]:
         env_lines.append("export PYGPI_PYTHON_BIN={}/bin/python3".format(ctx.attrs.venv))
         env_lines.append("VENV_SITE=$({venv}/bin/python3 -c \"import site; print(':'.join(site.getsitepackages()))\")".format(venv = ctx.attrs.venv))
 
-    env_lines.append(cmd_args("export COCOTB_TEST_MODULES=", ctx.attrs.test_module, delimiter = ""))
+    env_lines.append(cmd_args("export COCOTB_TEST_MODULES=", test_module, delimiter = ""))
     env_lines.append(cmd_args("export COCOTB_TOPLEVEL=", model_info.top_module, delimiter = ""))
     env_lines.append("export TOPLEVEL_LANG=verilog")
     pythonpath_parts = []
@@ -69,6 +68,19 @@ def _cocotb_test_impl(ctx: AnalysisContext) -> list[Provider]:
     for key, value in ctx.attrs.env.items():
         env_lines.append("export {}=\"{}\"".format(key, value))
 
+    return env_lines
+
+def _cocotb_test_impl(ctx: AnalysisContext) -> list[Provider]:
+    model_info = ctx.attrs.model[VerilatorModelInfo]
+
+    results_xml = ctx.actions.declare_output("results.xml")
+    dump_fst = ctx.actions.declare_output("dump.fst")
+
+    vtop = _link_vtop(ctx, model_info)
+
+    # ── Test-run action ───────────────────────────────────────────────────────
+    env_lines = _cocotb_env_lines(ctx, model_info, ctx.attrs.test_module)
+
     cp_results = cmd_args("cp \"$WORKDIR/results.xml\"", results_xml.as_output(), "2>/dev/null || echo '<testsuites/>' >", results_xml.as_output(), delimiter = " ")
     cp_fst = cmd_args("cp \"$WORKDIR/dump.fst\"", dump_fst.as_output(), "2>/dev/null || touch", dump_fst.as_output(), delimiter = " ")
 
@@ -128,3 +140,51 @@ cocotb_test = rule(
         "env": attrs.dict(key = attrs.string(), value = attrs.string(), default = {}),
     },
 )
+
+# ── Persistent worker ────────────────────────────────────────────────────────
+#
+# `buck2 run :<name> -- [spool]` starts the linked model with testbench_lib/worker/cocotb_worker.py
+# as its test module and leaves it running, taking jobs from worker_client.py. The test modules
+# to be run must be on python_path alongside testbench_lib/worker.
+
+def _cocotb_worker_impl(ctx: AnalysisContext) -> list[Provider]:
+    model_info = ctx.attrs.model[VerilatorModelInfo]
+    vtop = _link_vtop(ctx, model_info)
+
+    run_lines = [
+        "#!/bin/bash",
+        "set -e",
+        "SPOOL=$(realpath -m \"${1:-.cocotb_worker}\")",
+        "mkdir -p \"$SPOOL\"",
+        "WORKDIR=$(mktemp -d)",
+        "trap 'rm -rf \"$WORKDIR\"' EXIT",
+        cmd_args("cp", vtop, "\"$WORKDIR/Vtop\"", delimiter = " "),
+        "chmod +x \"$WORKDIR/Vtop\"",
+        "cd \"$WORKDIR\"",
+        "export COCOTB_WORKER_SPOOL=\"$SPOOL\"",
+    ] + _cocotb_env_lines(ctx, model_info, "cocotb_worker") + [
+        "\"$WORKDIR/Vtop\"",
+    ]
+
+    run_script = ctx.actions.write(
+        "cocotb_worker.sh",
+        cmd_args(run_lines, delimiter = "\n"),
+        is_executable = True,
+    )
+
+    return [
+        DefaultInfo(default_output = vtop),
+        RunInfo(args = cmd_args(["bash", run_script], hidden = [vtop])),
+    ]
+
+cocotb_worker = rule(
+    impl = _cocotb_worker_impl,
+    attrs = {
+        "model": attrs.dep(providers = [VerilatorModelInfo]),
+        "cocotb_lib_dir": attrs.string(),
+        "verilator_cpp": attrs.string(),
+        "python_path": attrs.list(attrs.string(), default = []),
+        "venv": attrs.string(default = ""),
+        "env": attrs.dict(key = attrs.string(), value = attrs.string(), default = {}),
+    },
+)
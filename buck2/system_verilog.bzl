@@ -50,6 +50,60 @@ sv_library = rule(
     },
 )
 
+# N independent copies of a module on a shared clock, see multi_instance_wrapper.py. The
+# wrapper is named <module>_x<instances> and brings out copy k's ports as i<k>_<port>.
+def _sv_multi_instance_impl(ctx: AnalysisContext) -> list[Provider]:
+    wrapper = ctx.actions.declare_output("{}_x{}.sv".format(ctx.attrs.module, ctx.attrs.instances))
+
+    ctx.actions.run(
+        cmd_args(
+            ctx.attrs.python_bin,
+            ctx.attrs.generator,
+            ctx.attrs.src,
+            ctx.attrs.module,
+            str(ctx.attrs.instances),
+            wrapper.as_output(),
+            ",".join(ctx.attrs.shared_ports),
+        ),
+        category = "sv_multi_instance",
+    )
+
+    transitive_sources = ctx.actions.tset(
+        SvSourceTSet,
+        value = [wrapper],
+        children = [dep[SvSourcesInfo].transitive_sources for dep in ctx.attrs.deps],
+    )
+    transitive_blackboxes = ctx.actions.tset(
+        SvBlackboxTSet,
+        children = [dep[SvSourcesInfo].transitive_blackboxes for dep in ctx.attrs.deps],
+    )
+    transitive_include_dirs = ctx.actions.tset(
+        SvIncludeDirTSet,
+        children = [dep[SvSourcesInfo].transitive_include_dirs for dep in ctx.attrs.deps],
+    )
+
+    return [
+        DefaultInfo(default_output = wrapper),
+        SvSourcesInfo(
+            transitive_sources = transitive_sources,
+            transitive_blackboxes = transitive_blackboxes,
+            transitive_include_dirs = transitive_include_dirs,
+        ),
+    ]
+
+sv_multi_instance = rule(
+    impl = _sv_multi_instance_impl,
+    attrs = {
+        "src": attrs.source(),
+        "module": attrs.string(),
+        "instances": attrs.int(),
+        "shared_ports": attrs.list(attrs.string(), default = ["clk_i"]),
+        "deps": attrs.list(attrs.dep(providers = [SvSourcesInfo]), default = []),
+        "generator": attrs.source(default = "//testbench_lib/verilator:multi_instance_wrapper.py"),
+        "python_bin": attrs.string(default = "python3"),
+    },
+)
+
 def _dedup_traverse(tset):
     seen = {}
     result = []
@@ -5,6 +5,7 @@ VerilatorModelInfo = provider(fields = {
     "include_dir": provider_field(typing.Any),
     "top_module": provider_field(typing.Any),
     "trace": provider_field(typing.Any),
+    "threads": provider_field(typing.Any),
 })
 
 def _verilator_model_impl(ctx: AnalysisContext) -> list[Provider]:
@@ -15,9 +16,11 @@ def _verilator_model_impl(ctx: AnalysisContext) -> list[Provider]:
 
     slang_cmd = slang_order_cmd(sources, include_dirs, ctx.attrs.top_module, "$MDIR/sv_order.txt")
 
-    vargs = ["verilator", "-cc", "--vpi", "--public-flat-rw", "--prefix", "Vtop", "--build"]
+    # -fPIC so the archive can also be linked into the shared library of verilator_shared_model.
+    vargs = ["verilator", "-cc", "--vpi", "--public-flat-rw", "--prefix", "Vtop", "--build", "-CFLAGS", "-fPIC"]
     vargs.extend(["--top-module", ctx.attrs.top_module])
     vargs.extend(["--timescale", "1ns/1ps"])
+    vargs.extend(["--threads", str(ctx.attrs.threads)])
 
     if ctx.attrs.trace:
         vargs.extend(["--trace", "--trace-fst", "--trace-structs"])
@@ -69,10 +72,11 @@ def _verilator_model_impl(ctx: AnalysisContext) -> list[Provider]:
             include_dir = include_dir,
             top_module = ctx.attrs.top_module,
             trace = ctx.attrs.trace,
+            threads = ctx.attrs.threads,
         ),
     ]
 
-verilator_model = rule(
+verilator_model_rule = rule(
     impl = _verilator_model_impl,
     attrs = {
         "top_module": attrs.string(),
@@ -80,5 +84,143 @@ verilator_model = rule(
         "parameters": attrs.dict(key = attrs.string(), value = attrs.string(), default = {}),
         "compile_args": attrs.list(attrs.string(), default = []),
         "trace": attrs.bool(default = True),
+        "threads": attrs.int(default = 1),
+    },
+)
+
+# Key of a model in the [verilator_threads] config section, e.g. fpgashark.packet_buffer.packet_buffer_model.
+def verilator_threads_key(package, name):
+    return "{}.{}".format(package.replace("/", "."), name)
+
+# Verilator --threads for the model. Without an explicit threads argument it comes from
+# [verilator_threads] in buck2/verilator_threads.buckconfig, written by
+# testbench_lib/verilator/thread_tuner.py, and falls back to single threaded.
+def verilator_model(name, threads = None, **kwargs):
+    if threads == None:
+        threads = int(read_config("verilator_threads", verilator_threads_key(package_name(), name), "1"))
+    verilator_model_rule(name = name, threads = threads, **kwargs)
+
+# ── Direct (in-process) backend ──────────────────────────────────────────────
+#
+# Links a verilator_model into a shared library with a generated C ABI shim, loaded through
+# ctypes by testbench_lib.verilator.VerilatorModel without cocotb or VPI in the loop.
+
+VerilatorSharedModelInfo = provider(fields = {
+    "lib": provider_field(typing.Any),
+    "top_module": provider_field(typing.Any),
+})
+
+def _verilator_shared_model_impl(ctx: AnalysisContext) -> list[Provider]:
+    model_info = ctx.attrs.model[VerilatorModelInfo]
+
+    shim = ctx.actions.declare_output("vtop_shim.cpp")
+    lib = ctx.actions.declare_output("libVtop.so")
+
+    runtime_cpps = [
+        "$VERILATOR_ROOT/include/verilated.cpp",
+        "$VERILATOR_ROOT/include/verilated_vpi.cpp",
+        "$VERILATOR_ROOT/include/verilated_threads.cpp",
+    ]
+    if model_info.trace:
+        runtime_cpps.append("$VERILATOR_ROOT/include/verilated_fst_c.cpp")
+
+    link_args = [
+        "g++", "-std=c++17", "-O2", "-pthread", "-shared", "-fPIC", "-o", lib.as_output(),
+        cmd_args("-I", model_info.include_dir, delimiter = ""),
+        "-I$VERILATOR_ROOT/include",
+        "-I$VERILATOR_ROOT/include/vltstd",
+        shim,
+    ] + runtime_cpps + [
+        model_info.lib,
+        "-lz",
+    ]
+
+    ctx.actions.run(
+        cmd_args(
+            ctx.attrs.python_bin,
+            ctx.attrs.shim_script,
+            cmd_args(model_info.include_dir, "/Vtop.h", delimiter = ""),
+            shim.as_output(),
+        ),
+        category = "verilator_shim",
+    )
+
+    script = ctx.actions.write(
+        "verilator_shared_link.sh",
+        cmd_args(
+            "#!/bin/bash",
+            "set -e",
+            "VERILATOR_ROOT=$(verilator --getenv VERILATOR_ROOT)",
+            cmd_args(link_args, delimiter = " "),
+            delimiter = "\n",
+        ),
+        is_executable = True,
+    )
+
+    ctx.actions.run(
+        cmd_args(["bash", script], hidden = [model_info.lib, model_info.include_dir, shim, lib.as_output()]),
+        category = "verilator_shared_link",
+    )
+
+    return [
+        DefaultInfo(default_output = lib),
+        VerilatorSharedModelInfo(lib = lib, top_module = model_info.top_module),
+    ]
+
+verilator_shared_model = rule(
+    impl = _verilator_shared_model_impl,
+    attrs = {
+        "model": attrs.dep(providers = [VerilatorModelInfo]),
+        "shim_script": attrs.source(default = "//testbench_lib/verilator:verilator_shim.py"),
+        "python_bin": attrs.string(default = "python3"),
+    },
+)
+
+# Runs <test_module>.main() in a plain Python process with VERILATOR_MODEL_LIB pointing at the
+# shared model. The log is the output; a non-zero exit fails the build.
+def _verilator_direct_test_impl(ctx: AnalysisContext) -> list[Provider]:
+    model_info = ctx.attrs.model[VerilatorSharedModelInfo]
+    log = ctx.actions.declare_output("direct_test.log")
+
+    python_bin = "python3"
+    env_lines = []
+    pythonpath_parts = list(ctx.attrs.python_path)
+    if ctx.attrs.venv:
+        python_bin = "{}/bin/python3".format(ctx.attrs.venv)
+        env_lines.append("export VIRTUAL_ENV={}".format(ctx.attrs.venv))
+    pythonpath_parts.append("$PYTHONPATH")
+    env_lines.append("export PYTHONPATH=\"{}\"".format(":".join(pythonpath_parts)))
+    env_lines.append(cmd_args("export VERILATOR_MODEL_LIB=$(realpath ", model_info.lib, ")", delimiter = ""))
+
+    for key, value in ctx.attrs.env.items():
+        env_lines.append("export {}=\"{}\"".format(key, value))
+
+    run_line = cmd_args(
+        python_bin, "-c", "\"import {m}; {m}.main()\"".format(m = ctx.attrs.test_module),
+        "2>&1 | tee", log.as_output(),
+        delimiter = " ",
+    )
+
+    script = ctx.actions.write(
+        "verilator_direct_run.sh",
+        cmd_args(["#!/bin/bash", "set -eo pipefail"] + env_lines + [run_line], delimiter = "\n"),
+        is_executable = True,
+    )
+
+    ctx.actions.run(
+        cmd_args(["bash", script], hidden = [model_info.lib, log.as_output()]),
+        category = "verilator_direct_test",
+    )
+
+    return [DefaultInfo(default_output = log)]
+
+verilator_direct_test = rule(
+    impl = _verilator_direct_test_impl,
+    attrs = {
+        "model": attrs.dep(providers = [VerilatorSharedModelInfo]),
+        "test_module": attrs.string(),
+        "python_path": attrs.list(attrs.string(), default = []),
+        "venv": attrs.string(default = ""),
+        "env": attrs.dict(key = attrs.string(), value = attrs.string(), default = {}),
     },
 )
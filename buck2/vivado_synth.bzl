@@ -3,6 +3,9 @@ load("//buck2:system_verilog.bzl", "SvSourcesInfo", "collect_transitive_sv", "sl
 VivadoSynthInfo = provider(fields = {
     "utilization_report": provider_field(typing.Any),
     "timing_report":      provider_field(typing.Any),
+    "top_module":         provider_field(typing.Any),
+    "parameters":         provider_field(typing.Any),
+    "part":               provider_field(typing.Any),
 })
 
 # Sources and the output path are injected at run-time via -tclargs so that
@@ -87,6 +90,9 @@ def _vivado_synth_impl(ctx: AnalysisContext) -> list[Provider]:
         VivadoSynthInfo(
             utilization_report = util_report,
             timing_report      = timing_report,
+            top_module         = ctx.attrs.top_module,
+            parameters         = ctx.attrs.parameters,
+            part               = ctx.attrs.part,
         ),
     ]
 
@@ -138,3 +144,73 @@ vivado_compare = rule(
     },
     impl = _vivado_compare_impl,
 )
+
+# ── QoR history rule ─────────────────────────────────────────────────────────
+#
+# `buck2 run` records each synth's utilization and timing in an SQLite history keyed by target,
+# parameters, part and git revision (see qor_history.py), then prints the recent trend with any
+# regressions against the previous run. With fail_on_regression the run exits non-zero when the
+# latest run of a synth regressed by more than the thresholds. Recording is left to `buck2 run`
+# rather than a build action so the database write is never cached or skipped. `buck2 build`
+# only synthesizes. The database defaults to the database attribute; an argument after `--`
+# overrides it. Relative paths are taken from the directory buck2 is run in.
+
+def _vivado_qor_history_impl(ctx: AnalysisContext) -> list[Provider]:
+    thresholds = []
+    for threshold in ctx.attrs.thresholds:
+        thresholds.extend(["--threshold", "'{}'".format(threshold)])
+
+    history = cmd_args([ctx.attrs.python_bin, ctx.attrs.history_script, "\"$DB\""], delimiter = " ")
+
+    lines = [
+        "#!/bin/bash",
+        "set -e",
+        "DB=$(realpath -m \"${{1:-{}}}\")".format(ctx.attrs.database),
+    ]
+    targets = []
+    reports = []
+    for dep in ctx.attrs.synths:
+        info   = dep[VivadoSynthInfo]
+        target = "//{}:{}".format(dep.label.package, dep.label.name)
+        targets.extend(["--target", target])
+        reports.extend([info.utilization_report, info.timing_report])
+
+        record = cmd_args(
+            [history, "record", target, info.utilization_report, info.timing_report, "--part", info.part],
+            delimiter = " ",
+        )
+        for key, value in info.parameters.items():
+            record.add("--param", "{}={}".format(key, value))
+        record.add(thresholds)
+        record.add("> /dev/null")
+        lines.append(record)
+
+    lines.append(cmd_args([history, "report"] + targets + thresholds, delimiter = " "))
+    if ctx.attrs.fail_on_regression:
+        lines.append(cmd_args([history, "check"] + targets + thresholds, delimiter = " "))
+
+    script = ctx.actions.write(
+        "vivado_qor_history.sh",
+        cmd_args(lines, delimiter = "\n"),
+        is_executable = True,
+        # Runs from wherever buck2 was invoked, not the project root.
+        absolute = True,
+    )
+
+    return [
+        DefaultInfo(default_outputs = reports),
+        RunInfo(args = cmd_args(["bash", script], hidden = reports + [ctx.attrs.history_script, ctx.attrs.compare_script])),
+    ]
+
+vivado_qor_history = rule(
+    attrs = {
+        "synths":             attrs.list(attrs.dep(providers = [VivadoSynthInfo])),
+        "history_script":     attrs.source(),
+        "compare_script":     attrs.source(),
+        "python_bin":         attrs.string(default = "python3"),
+        "database":           attrs.string(default = "qor_history.sqlite"),
+        "thresholds":         attrs.list(attrs.string(), default = []),
+        "fail_on_regression": attrs.bool(default = False),
+    },
+    impl = _vivado_qor_history_impl,
+)
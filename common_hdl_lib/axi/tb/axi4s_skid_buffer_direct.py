@@ -0,0 +1,22 @@
+import os
+import logging
+from itertools import product
+
+from testbench_lib.verilator import VerilatorModel
+from axi4s_skid_buffer_tb import build_env, build_config
+
+# Same stall grid as axi4s_skid_buffer_tb.test, run in-process through the direct Verilator
+# backend instead of cocotb/VPI. Run by the verilator_direct_test rule.
+STALL_PROBABILITIES = [0, 0.1, 0.95]
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+
+    for master_stall_probability, slave_stall_probability in product(STALL_PROBABILITIES, STALL_PROBABILITIES):
+        with VerilatorModel(os.environ["VERILATOR_MODEL_LIB"]) as model:
+            env = build_env(model.module())
+            config = build_config()
+            config["driver_stall_probability"] = master_stall_probability
+            config["monitor_stall_probability"] = slave_stall_probability
+            env.set_configuration(config)
+            env.run_direct(model)
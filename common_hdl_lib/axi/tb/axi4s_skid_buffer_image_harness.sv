@@ -0,0 +1,66 @@
+// Drives axi4s_skid_buffer from a pre-packed memory image so no Python runs per input beat.
+
+module axi4s_skid_buffer_image_harness #(
+    parameter AXI_WIDTH   = 64,
+    parameter IMAGE_DEPTH = 65536
+) (
+    input  logic                       clk_i,
+    input  logic                       rst_i,
+
+    // Image Streamer Control
+    input  logic                       img_load_i,
+    input  logic [31:0]                img_id_i,
+    output logic                       img_done_o,
+    output logic [AXI_WIDTH - 1:0]     img_tdata_o,
+
+    // Downstream (Slave Side)
+    output logic [AXI_WIDTH - 1:0]     s_tdata_o,
+    output logic                       s_tvalid_o,
+    input  logic                       s_tready_i,
+    output logic                       s_tlast_o,
+    output logic [AXI_WIDTH / 8 - 1:0] s_tkeep_o
+);
+
+    logic                       m_tvalid_w;
+    logic                       m_tready_w;
+    logic                       m_tlast_w;
+    logic [AXI_WIDTH / 8 - 1:0] m_tkeep_w;
+
+    axi4s_image_streamer #(
+        .AXI_WIDTH   (AXI_WIDTH),
+        .IMAGE_DEPTH (IMAGE_DEPTH)
+    ) image_streamer_i (
+        .clk_i      (clk_i),
+        .rst_i      (rst_i),
+        .load_i     (img_load_i),
+        .image_id_i (img_id_i),
+        .done_o     (img_done_o),
+        .tdata_o    (img_tdata_o),
+        .tvalid_o   (m_tvalid_w),
+        .tready_i   (m_tready_w),
+        .tlast_o    (m_tlast_w),
+        .tkeep_o    (m_tkeep_w)
+    );
+
+    axi4s_skid_buffer #(
+        .AXI_WIDTH (AXI_WIDTH)
+    ) axi4s_skid_buffer_i (
+        .clk_i      (clk_i),
+        .rst_i      (rst_i),
+
+        // Upstream (Master Side)
+        .m_tdata_i  (img_tdata_o),
+        .m_tvalid_i (m_tvalid_w),
+        .m_tready_o (m_tready_w),
+        .m_tlast_i  (m_tlast_w),
+        .m_tkeep_i  (m_tkeep_w),
+
+        // Downstream (Slave Side)
+        .s_tdata_o  (s_tdata_o),
+        .s_tvalid_o (s_tvalid_o),
+        .s_tready_i (s_tready_i),
+        .s_tlast_o  (s_tlast_o),
+        .s_tkeep_o  (s_tkeep_o)
+    );
+
+endmodule
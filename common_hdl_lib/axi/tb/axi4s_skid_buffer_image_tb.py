@@ -0,0 +1,88 @@
+from typing import Any
+
+import cocotb
+from testbench_lib.axi import AXI4SBus, AXI4SImageBus, AXI4SImageDriver, AXI4SMonitor
+from testbench_lib.core import BaseScoreboard, BaseEnvironment, ResetSequence, Module, BASE_CONFIG
+from axi4s_skid_buffer_tb import random_byte_stream, build_config as skid_buffer_config
+
+# The image driver leaves Python out of the input side, so the run is ten times longer than
+# axi4s_skid_buffer_tb. driver_stall_probability is packed into the image.
+def build_config() -> dict[str, Any]:
+    config = skid_buffer_config()
+    config["scoreboard_expected_matches"] = 10000
+    config["num_transactions"] = 10000
+    return config
+
+
+def build_env(module: Module) -> BaseEnvironment:
+
+    slave_axis = AXI4SBus(
+        module  = module,
+        signals = {
+            "tdata"  : "s_tdata_o",
+            "tvalid" : "s_tvalid_o",
+            "tready" : "s_tready_i",
+            "tlast"  : "s_tlast_o",
+            "tkeep"  : "s_tkeep_o",
+        }
+    )
+
+    image_port = AXI4SImageBus(
+        module  = module,
+        signals = {
+            "tdata" : "img_tdata_o",
+            "load"  : "img_load_i",
+            "id"    : "img_id_i",
+            "done"  : "img_done_o",
+        }
+    )
+    env = BaseEnvironment()
+    env.set_clock(module.clk_i)
+    env.add_reset(
+        ResetSequence(
+            clock      = module.clk_i,
+            reset      = module.rst_i,
+            num_cycles = 10
+        )
+    )
+    env.set_scoreboard(
+        BaseScoreboard(
+            process_transaction_callback=lambda x: x,
+        )
+    )
+    driver = AXI4SImageDriver(
+        clock             = module.clk_i,
+        port              = image_port,
+        expect_callback   = env._scoreboard.expect_transaction,
+    )
+    env.add_driver(
+        "AXI4S Image Driver",
+        driver,
+        transaction_generator = random_byte_stream(driver)
+    )
+    env.add_monitor(
+        "AXI4S Slave Monitor",
+        AXI4SMonitor(
+            clock             = module.clk_i,
+            port              = slave_axis,
+            receive_callback  = env._scoreboard.receive_transaction,
+        )
+    )
+
+    return env
+
+@cocotb.test(
+    timeout_time=BASE_CONFIG["timeout_cycles"] * BASE_CONFIG["clock_period"],
+    timeout_unit=BASE_CONFIG["timescale"]
+)
+@cocotb.parametrize(
+    master_stall_probability=[0, 0.1, 0.95],
+    slave_stall_probability=[0, 0.1, 0.95]
+)
+async def test(dut, master_stall_probability, slave_stall_probability):
+    env = build_env(Module(dut))
+    config = build_config()
+    config["driver_stall_probability"] = master_stall_probability
+    config["monitor_stall_probability"] = slave_stall_probability
+    env.set_configuration(config)
+    await env.run()
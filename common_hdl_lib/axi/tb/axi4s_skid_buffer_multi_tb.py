@@ -0,0 +1,30 @@
+from itertools import product
+
+import cocotb
+from testbench_lib.core import Module, BASE_CONFIG, run_environments
+from axi4s_skid_buffer_tb import build_env, build_config
+
+# The stall grid of axi4s_skid_buffer_tb.test in a single simulation, one cell per copy of the
+# skid buffer in axi4s_skid_buffer_x9 (see the axi4s_skid_buffer_x9 target). Each copy draws
+# from its own random stream, derived from the run's seed and the environment name.
+STALL_PROBABILITIES = [0, 0.1, 0.95]
+
+@cocotb.test(
+    timeout_time=BASE_CONFIG["timeout_cycles"] * BASE_CONFIG["clock_period"],
+    timeout_unit=BASE_CONFIG["timescale"]
+)
+async def test(dut):
+    module = Module(dut)
+
+    environments = {}
+    for k, (master_stall_probability, slave_stall_probability) in enumerate(product(STALL_PROBABILITIES, STALL_PROBABILITIES)):
+        env = build_env(module.instance(f"i{k}_"))
+        config = build_config()
+        config["driver_stall_probability"] = master_stall_probability
+        config["monitor_stall_probability"] = slave_stall_probability
+        env.set_configuration(config)
+
+        dut._log.info(f"i{k}: master_stall_probability={master_stall_probability} slave_stall_probability={slave_stall_probability}")
+        environments[f"i{k}"] = env
+
+    await run_environments(environments)
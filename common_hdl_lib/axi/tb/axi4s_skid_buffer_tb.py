@@ -1,20 +1,21 @@
-import random
-from typing import Any
+from typing import Any, Callable, Iterator, Union
 
 import cocotb
-from testbench_lib.axi import AXI4SBus, AXI4SDriver, AXI4SMonitor
-from testbench_lib.core import BaseScoreboard, BaseEnvironment, ResetSequence, Module, BASE_CONFIG
+from cocotb.triggers import Timer
+from testbench_lib.axi import AXI4SBus, AXI4SDriver, AXI4SImageDriver, AXI4SMonitor
+from testbench_lib.core import BaseScoreboard, BaseEnvironment, ResetSequence, Module, ProbeSet, BASE_CONFIG
 
 from testbench_lib.core import BaseScoreboard, Bytes, Module
 
-def random_byte_stream(config: dict[str, Any]) -> list[Bytes]:
-    transactions = []
-    for _ in range(config["num_transactions"]):
-        random_bytes = []
-        for _ in range(random.randint(1, config["max_packet_size"])):
-            random_bytes.append(random.getrandbits(8))
-        transactions.append(Bytes(random_bytes))
-    return transactions
+# Packets are generated lazily so the driver can steer sizes towards uncovered bins.
+def random_byte_stream(driver: Union[AXI4SDriver, AXI4SImageDriver]) -> Callable[[dict[str, Any]], Iterator[Bytes]]:
+    def generate(config: dict[str, Any]) -> Iterator[Bytes]:
+        for _ in range(config["num_transactions"]):
+            random_bytes = []
+            for _ in range(driver.packet_size(config["max_packet_size"])):
+                random_bytes.append(driver.rng.getrandbits(8))
+            yield Bytes(random_bytes)
+    return generate
 
 def build_config() -> dict[str, Any]:
     base = BASE_CONFIG.copy()
@@ -25,12 +26,13 @@ def build_config() -> dict[str, Any]:
         "driver_stall_probability"  : None, # Chance of Master not ready (valid low).
         "num_transactions"          : 1000,
         "max_packet_size"           : 64,
+        "watchdog_cycles"           : 10000, # Fail a stalled run long before timeout_cycles.
     }
 
     return base | config
 
 
-def build_env(module: Module) -> BaseEnvironment:
+def build_env(module: Module, model: Callable[[Bytes], Bytes] = lambda x: x) -> BaseEnvironment:
 
     slave_axis = AXI4SBus(
         module  = module,
@@ -64,17 +66,18 @@ def build_env(module: Module) -> BaseEnvironment:
     )
     env.set_scoreboard(
         BaseScoreboard(
-            process_transaction_callback=lambda x: x,
+            process_transaction_callback=model,
         )
     )
+    driver = AXI4SDriver(
+        clock             = module.clk_i,
+        port              = master_axis,
+        expect_callback   = env._scoreboard.expect_transaction,
+    )
     env.add_driver(
         "AXI4S Master Driver",
-        AXI4SDriver(
-            clock             = module.clk_i,
-            port              = master_axis,
-            expect_callback   = env._scoreboard.expect_transaction,
-        ),
-        transaction_generator = random_byte_stream
+        driver,
+        transaction_generator = random_byte_stream(driver)
     )
     env.add_monitor(
         "AXI4S Slave Monitor",
@@ -97,8 +100,61 @@ def build_env(module: Module) -> BaseEnvironment:
 )
 async def test(dut, master_stall_probability, slave_stall_probability):
     env = build_env(Module(dut))
+
+    # Upstream stall duty, sampled only when tready toggles.
+    probes = ProbeSet(dut.clk_i, dut)
+    probes.add("m_tready_o", "m_tready_o", on_change=True)
+    env.add_probes(probes)
+
     config = build_config()
     config["driver_stall_probability"] = master_stall_probability
     config["monitor_stall_probability"] = slave_stall_probability
     env.set_configuration(config)
     await env.run()
+
+
+# Opt-in coverage-driven run: packet contents are steered towards open bins and the run stops
+# once every bin has been hit coverage_goal times, with num_transactions as an upper bound.
+@cocotb.test(
+    timeout_time=BASE_CONFIG["timeout_cycles"] * BASE_CONFIG["clock_period"],
+    timeout_unit=BASE_CONFIG["timescale"]
+)
+async def test_coverage_closure(dut):
+    env = build_env(Module(dut))
+
+    config = build_config()
+    config["driver_stall_probability"] = 0.1
+    config["monitor_stall_probability"] = 0.1
+    # Short gaps so back_to_back closes without the driver overriding its idle cycles.
+    config["driver_pre_delay_range"] = range(0, 2)
+    config["driver_post_delay_range"] = range(0, 2)
+    config["coverage_directed"] = True
+    config["coverage_terminate"] = True
+    config["coverage_goal"] = 4
+    env.set_configuration(config)
+    await env.run()
+
+
+# A failing run must take its progress watchdog down with it, or the watchdog outlives the test.
+@cocotb.test(
+    timeout_time=BASE_CONFIG["timeout_cycles"] * BASE_CONFIG["clock_period"],
+    timeout_unit=BASE_CONFIG["timescale"]
+)
+async def test_watchdog_cancelled_on_failure(dut):
+    env = build_env(Module(dut), model=lambda x: Bytes(bytes(x) + b"\0"))
+
+    config = build_config()
+    config["driver_stall_probability"] = 0
+    config["monitor_stall_probability"] = 0
+    env.set_configuration(config)
+
+    try:
+        await env.run()
+    except ValueError as error:
+        dut._log.info(f"Expected failure: {error}")
+    else:
+        raise AssertionError("Corrupted model did not fail the run")
+
+    await Timer(config["clock_period"], config["timescale"])
+    assert env.watchdog_task is not None, "Watchdog never started"
+    assert env.watchdog_task.done(), "Watchdog still running after the run failed"
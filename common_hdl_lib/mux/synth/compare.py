@@ -22,6 +22,8 @@ _SUB_RE          = re.compile(r'^\|\s{3,}')
 _ROW_RE          = re.compile(r'^\|\s+(.*?)\s*\*?\s*\|\s+(\d+)\s*\|\s+\d+\s*\|\s+(\d+)\s*\|')
 _DESIGN_RE       = re.compile(r'^\|\s*Design\s*:\s*(\S+)')
 _LOGIC_LEVELS_RE = re.compile(r'Logic Levels:\s+(\d+)')
+_SLACK_RE        = re.compile(r'^Slack(?:\s+\(\w+\))?\s*:\s*(-?[\d.]+)ns')
+_DATA_PATH_RE    = re.compile(r'Data Path Delay:\s+(-?[\d.]+)ns')
 
 
 def _parse(path):
@@ -61,6 +63,30 @@ def _parse_timing(path):
     return max_levels
 
 
+def _parse_slack(path):
+    """Return (worst slack, longest data path delay) in ns from a Vivado timing report.
+
+    Slack is None when the report has no constrained paths (Slack: inf), which is the
+    usual case for out-of-context runs without a clock constraint.
+    """
+    slack     = None
+    data_path = None
+    with open(path) as f:
+        for line in f:
+            m = _SLACK_RE.match(line.strip())
+            if m:
+                value = float(m.group(1))
+                if slack is None or value < slack:
+                    slack = value
+                continue
+            m = _DATA_PATH_RE.search(line)
+            if m:
+                value = float(m.group(1))
+                if data_path is None or value > data_path:
+                    data_path = value
+    return slack, data_path
+
+
 def _pct(a, b):
     if b == 0:
         return ""
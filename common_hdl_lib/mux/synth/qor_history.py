@@ -0,0 +1,264 @@
+"""Record Vivado synthesis results in an SQLite history and report trends and regressions.
+
+Usage: qor_history.py <db> record <target> <util> <timing> [--part P] [--param NAME=VALUE ...]
+                      [--revision REV] [--threshold METRIC=LIMIT ...] [--fail-on-regression]
+       qor_history.py <db> report [--target T ...] [--last N] [--threshold METRIC=LIMIT ...]
+       qor_history.py <db> check [--target T ...] [--threshold METRIC=LIMIT ...]
+
+Runs are keyed by target, parameters, part and source revision; recording the same key again
+replaces the earlier run's metrics in place. Trends are shown per target/parameters/part in recording order, and a
+run is flagged when a metric is worse than the previous run by more than its threshold. Limits
+ending in % are relative, anything else is absolute (ns for timing), e.g.
+    --threshold "Slice LUTs=5%" --threshold "Slack (ns)=0.2"
+check exits non-zero if the latest run of any target regressed.
+"""
+
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import subprocess
+
+from compare import _parse, _parse_timing, _parse_slack
+
+LEVELS    = "Max Logic Levels"
+SLACK     = "Slack (ns)"
+DATA_PATH = "Data Path Delay (ns)"
+
+# (column heading, metric) shown by report.
+_TREND = [
+    ("LUTs",   "Slice LUTs"),
+    ("Regs",   "Slice Registers"),
+    ("DSPs",   "DSPs"),
+    ("Levels", LEVELS),
+    ("Path",   DATA_PATH),
+    ("Slack",  SLACK),
+]
+
+# Metrics where a smaller value is a regression.
+_HIGHER_IS_BETTER = {SLACK}
+
+_DEFAULT_THRESHOLDS = {
+    "Slice LUTs":      "2%",
+    "Slice Registers": "2%",
+    "DSPs":            "0",
+    LEVELS:            "0",
+    DATA_PATH:         "5%",
+    SLACK:             "0.05",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    target      TEXT NOT NULL,
+    top_module  TEXT NOT NULL,
+    parameters  TEXT NOT NULL,
+    part        TEXT NOT NULL,
+    revision    TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    UNIQUE (target, parameters, part, revision)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id    INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name      TEXT NOT NULL,
+    value     REAL NOT NULL,
+    available INTEGER,
+    PRIMARY KEY (run_id, name)
+);
+"""
+
+
+def _connect(path):
+    db = sqlite3.connect(path, timeout=60)
+    db.execute("PRAGMA foreign_keys = ON")
+    db.executescript(_SCHEMA)
+    return db
+
+
+def _revision():
+    try:
+        result = subprocess.run(
+            ["git", "describe", "--always", "--dirty", "--abbrev=12"],
+            capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return result.stdout.strip()
+
+
+def _parse_thresholds(specs):
+    """Return metric → (limit, relative) from the defaults overridden by NAME=LIMIT specs."""
+    thresholds = {}
+    for spec in [f"{k}={v}" for k, v in _DEFAULT_THRESHOLDS.items()] + (specs or []):
+        name, _, limit = spec.rpartition("=")
+        if not name or not limit:
+            sys.exit(f"Expected METRIC=LIMIT, got '{spec}'")
+        relative = limit.endswith("%")
+        thresholds[name.strip()] = (float(limit.rstrip("%")), relative)
+    return thresholds
+
+
+def _regression(name, previous, current, thresholds):
+    """Return a description if current is worse than previous by more than the threshold."""
+    if name not in thresholds or previous is None or current is None:
+        return None
+    limit, relative = thresholds[name]
+    worse = previous - current if name in _HIGHER_IS_BETTER else current - previous
+    if relative:
+        if previous == 0:
+            exceeded = worse > 0
+        else:
+            exceeded = 100.0 * worse / abs(previous) > limit
+    else:
+        exceeded = worse > limit
+    if not exceeded:
+        return None
+    return f"{name}: {previous:g} -> {current:g}"
+
+
+def record(db, target, util, timing, part, parameters, revision):
+    module, metrics, _ = _parse(util)
+    levels             = _parse_timing(timing)
+    slack, data_path   = _parse_slack(timing)
+
+    values = {name: (used, avail) for name, (used, avail) in metrics.items()}
+    for name, value in ((LEVELS, levels), (SLACK, slack), (DATA_PATH, data_path)):
+        if value is not None:
+            values[name] = (value, None)
+
+    # Recording a key again updates the run in place, so it keeps its id and with it its place
+    # in the trend.
+    key = (target, json.dumps(parameters, sort_keys=True), part, revision)
+    with db:
+        (run_id,) = db.execute(
+            "INSERT INTO runs (target, parameters, part, revision, top_module, recorded_at) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (target, parameters, part, revision) DO UPDATE SET "
+            "top_module = excluded.top_module, recorded_at = excluded.recorded_at RETURNING id",
+            key + (module, time.strftime("%Y-%m-%d %H:%M:%S")),
+        ).fetchone()
+        db.execute("DELETE FROM metrics WHERE run_id = ?", (run_id,))
+        db.executemany(
+            "INSERT INTO metrics (run_id, name, value, available) VALUES (?, ?, ?, ?)",
+            [(run_id, name, value, avail) for name, (value, avail) in values.items()],
+        )
+
+
+def _history(db, targets=None):
+    """Return (target, parameters, part) → runs in recording order, each a dict of run columns and metrics."""
+    query = "SELECT id, target, parameters, part, revision, top_module, recorded_at FROM runs"
+    args  = ()
+    if targets:
+        query += " WHERE target IN ({})".format(", ".join("?" * len(targets)))
+        args   = tuple(targets)
+
+    history = {}
+    for run_id, run_target, parameters, part, revision, module, recorded_at in db.execute(query + " ORDER BY id", args):
+        metrics = dict(db.execute("SELECT name, value FROM metrics WHERE run_id = ?", (run_id,)))
+        history.setdefault((run_target, parameters, part), []).append({
+            "revision":    revision,
+            "module":      module,
+            "recorded_at": recorded_at,
+            "metrics":     metrics,
+        })
+    return history
+
+
+def _regressions(previous, current, thresholds):
+    return [
+        message for name in sorted(current["metrics"].keys() | previous["metrics"].keys())
+        if (message := _regression(name, previous["metrics"].get(name), current["metrics"].get(name), thresholds))
+    ]
+
+
+def _format(value):
+    if value is None:
+        return "n/a"
+    return f"{value:.3f}" if value != int(value) else str(int(value))
+
+
+def _write_report(out, history, thresholds, last):
+    col = 14
+    w   = 8
+    header = "{:<{col}}  {:<19}".format("Revision", "Recorded", col=col) + "".join(
+        "  {:>{w}}".format(heading, w=w) for heading, _ in _TREND
+    )
+    rule = "─" * len(header)
+
+    lines   = ["=== Synthesis QoR history ==="]
+    flagged = []
+    for (target, parameters, part), runs in sorted(history.items()):
+        params = " ".join(f"{k}={v}" for k, v in json.loads(parameters).items())
+        lines += ["", f"{target} ({runs[-1]['module']}) {part} {params}".rstrip(), header, rule]
+
+        start = max(0, len(runs) - last)
+        for i in range(start, len(runs)):
+            run         = runs[i]
+            regressions = _regressions(runs[i - 1], run, thresholds) if i > 0 else []
+            bad         = {message.partition(":")[0] for message in regressions}
+            cells = "".join(
+                "  {:>{w}}".format(_format(run["metrics"].get(name)) + ("!" if name in bad else ""), w=w)
+                for _, name in _TREND
+            )
+            lines.append("{:<{col}}  {:<19}{}".format(run["revision"][:col], run["recorded_at"], cells, col=col))
+            for message in regressions:
+                lines.append(f"  regression {message}")
+            if i == len(runs) - 1 and regressions:
+                flagged.append((target, regressions))
+
+    out.write("\n".join(lines) + "\n")
+    return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record")
+    record_parser.add_argument("target")
+    record_parser.add_argument("util")
+    record_parser.add_argument("timing")
+    record_parser.add_argument("--part", default="")
+    record_parser.add_argument("--param", action="append", default=[])
+    record_parser.add_argument("--revision")
+    record_parser.add_argument("--fail-on-regression", action="store_true")
+
+    report_parser = commands.add_parser("report")
+    report_parser.add_argument("--last", type=int, default=10)
+
+    check_parser = commands.add_parser("check")
+
+    for command in (record_parser, report_parser, check_parser):
+        command.add_argument("--threshold", action="append", default=[])
+    for command in (report_parser, check_parser):
+        command.add_argument("--target", action="append", default=[])
+
+    args       = parser.parse_args()
+    thresholds = _parse_thresholds(args.threshold)
+    db         = _connect(args.db)
+
+    if args.command == "record":
+        parameters = dict(param.split("=", 1) for param in args.param)
+        record(db, args.target, args.util, args.timing, args.part, parameters, args.revision or _revision())
+        flagged = _write_report(sys.stdout, _history(db, [args.target]), thresholds, 10)
+        if flagged and args.fail_on_regression:
+            sys.exit(1)
+        return
+
+    history = _history(db, args.target)
+    if args.command == "report":
+        _write_report(sys.stdout, history, thresholds, args.last)
+        return
+
+    flagged = [
+        (target, regressions) for (target, _, _), runs in sorted(history.items()) if len(runs) > 1
+        if (regressions := _regressions(runs[-2], runs[-1], thresholds))
+    ]
+    for target, regressions in flagged:
+        print(f"{target}: {'; '.join(regressions)}")
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
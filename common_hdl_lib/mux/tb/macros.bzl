@@ -5,7 +5,9 @@ _COCOTB_LIB_DIR = "/home/poflynn/src/hardware-monorepo/.venv/lib/python3.13/site
 _VERILATOR_CPP  = "/home/poflynn/src/hardware-monorepo/.venv/lib/python3.13/site-packages/cocotb/share/lib/verilator/verilator.cpp"
 _VENV           = "/home/poflynn/src/hardware-monorepo/.venv"
 
-def modulo_tests(moduli, python_path, data_width = 8):
+# mode = "exhaustive" sweeps all 2^data_width inputs; "sampled" checks Barrett corner cases plus
+# sample_budget stratified random inputs (see modulo_tb.py), for widths beyond exhaustive range.
+def modulo_tests(moduli, python_path, data_width = 8, mode = "exhaustive", sample_budget = 65536):
     for m in moduli:
         verilator_sim(
             name           = "modulo_sim_m{}".format(m),
@@ -22,5 +24,10 @@ def modulo_tests(moduli, python_path, data_width = 8):
             test_module = "modulo_tb",
             venv        = _VENV,
             python_path = python_path,
-            env         = {"MODULUS": str(m), "DATA_WIDTH": str(data_width)},
+            env         = {
+                "MODULUS":       str(m),
+                "DATA_WIDTH":    str(data_width),
+                "MODE":          mode,
+                "SAMPLE_BUDGET": str(sample_budget),
+            },
         )
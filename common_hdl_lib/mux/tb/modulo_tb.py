@@ -1,25 +1,98 @@
 import os
+import random
 
 import cocotb
 from cocotb.triggers import Timer
 
+# MODE=exhaustive sweeps every input. MODE=sampled is for widths where that is out of reach: it
+# checks the analytically dangerous inputs for Barrett reduction plus SAMPLE_BUDGET stratified
+# random inputs, seeded from cocotb's RANDOM_SEED (set COCOTB_RANDOM_SEED to reproduce a run).
+MODE = os.environ.get("MODE", "exhaustive")
 
-@cocotb.test()
+
+async def check(dut, x, modulus):
+    dut.data_i.value = x
+    await Timer(1, "ns")
+
+    expected = x % modulus
+    naive    = int(dut.naive_o.value)
+    barrett  = int(dut.barrett_o.value)
+
+    assert naive == expected, (
+        f"naive:   {x} % {modulus} = {expected}, got {naive}"
+    )
+    assert barrett == expected, (
+        f"barrett: {x} % {modulus} = {expected}, got {barrett}"
+    )
+
+
+# Quotients to probe: the ends of the range plus num evenly spaced ones in between.
+def spread(limit, num):
+    points = {0, 1, 2, limit - 2, limit - 1, limit}
+    step = max(limit // max(num, 1), 1)
+    points.update(range(0, limit + 1, step))
+    return sorted(p for p in points if 0 <= p <= limit)
+
+
+# With MAGIC = floor(2^W / M) and e = 2^W - M * MAGIC, the quotient estimate for x = q*M + r is
+# one low exactly when r < q * e / MAGIC, i.e. below r* = ceil(q * e / MAGIC). x = q*M + r* - 1 is
+# the last input of each quotient that needs the correction step, q*M + r* the first that doesn't.
+def corner_cases(data_width, modulus, num_quotients):
+    top = 2**data_width - 1
+    max_quotient = top // modulus
+    magic = 2**data_width // modulus
+    error = 2**data_width - modulus * magic
+
+    cases = set()
+    for q in spread(max_quotient, num_quotients):
+        base = q * modulus
+        cases.update((base - 1, base, base + 1))
+        if magic and error:
+            boundary = -(-q * error // magic)
+            cases.update((base + boundary - 1, base + boundary))
+
+    cases.update(top - k for k in range(4))
+    cases.update((max_quotient * modulus - 1, max_quotient * modulus, max_quotient * modulus + 1))
+    return sorted(x for x in cases if 0 <= x <= top)
+
+
+# One uniform sample from each of num equal-width strata of [0, 2^W).
+def stratified_samples(data_width, num, rng):
+    size = 2**data_width
+    return [rng.randrange(i * size // num, max((i + 1) * size // num, i * size // num + 1)) for i in range(num)]
+
+
+@cocotb.test(skip=MODE != "exhaustive")
 async def test_exhaustive(dut):
     data_width = int(os.environ.get("DATA_WIDTH", "8"))
     modulus    = int(os.environ.get("MODULUS",     "7"))
 
     for x in range(2**data_width):
-        dut.data_i.value = x
-        await Timer(1, "ns")
-
-        expected = x % modulus
-        naive    = int(dut.naive_o.value)
-        barrett  = int(dut.barrett_o.value)
-
-        assert naive == expected, (
-            f"naive:   {x} % {modulus} = {expected}, got {naive}"
-        )
-        assert barrett == expected, (
-            f"barrett: {x} % {modulus} = {expected}, got {barrett}"
-        )
+        await check(dut, x, modulus)
+
+
+@cocotb.test(skip=MODE != "sampled")
+async def test_sampled(dut):
+    data_width = int(os.environ.get("DATA_WIDTH", "8"))
+    modulus    = int(os.environ.get("MODULUS",     "7"))
+    budget     = int(os.environ.get("SAMPLE_BUDGET", "65536"))
+    seed       = cocotb.RANDOM_SEED
+    dut._log.info(f"Sampling with seed {seed}, rerun with COCOTB_RANDOM_SEED={seed} to reproduce")
+
+    # A quarter of the budget goes on corner cases (about five inputs per probed quotient).
+    corners = corner_cases(data_width, modulus, budget // 20)
+    num_random = max(budget - len(corners), 1)
+    samples = stratified_samples(data_width, num_random, random.Random(seed))
+
+    for x in corners:
+        await check(dut, x, modulus)
+    for x in samples:
+        await check(dut, x, modulus)
+
+    # If a fraction p of inputs failed, all num_random uniform samples would miss them with
+    # probability (1 - p)^num_random, so p < 1 - 0.05^(1/num_random) at 95% confidence.
+    bound = 1 - 0.05 ** (1 / num_random)
+    dut._log.info(
+        f"seed={seed}: {len(corners)} corner cases and {num_random} stratified samples passed, "
+        f"failing fraction < {bound:.3g} ({bound * 2**data_width:.3g} inputs) at 95% confidence"
+    )
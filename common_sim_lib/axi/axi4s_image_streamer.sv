@@ -0,0 +1,98 @@
+// Simulation only module to play back a pre-packed AXI4Stream memory image.
+//
+// The image is a $readmemh file with one record per line, written by AXI4SImageDriver:
+//
+//   {valid, beat, gap[GAP_WIDTH-1:0], tlast, tkeep[AXI_WIDTH/8-1:0], tdata[AXI_WIDTH-1:0]}
+//
+// Each record idles for `gap` cycles after the previous handshake and then presents one
+// beat (beat = 1) or nothing (beat = 0, used to split gaps wider than GAP_WIDTH). The first
+// record with valid = 0 terminates the image. Pulsing load_i (re)reads the file and starts
+// playback, done_o rises once the terminator is reached.
+//
+// The file read is <prefix>_<image_id_i as 8 hex digits>.hex, with the prefix taken from the
+// +AXI4S_IMAGE plusarg or IMAGE_PREFIX, so several streamers and simulations can share a
+// working directory as long as each driver picks its own id.
+
+module axi4s_image_streamer #(
+    parameter int    AXI_WIDTH    = 64,
+    parameter int    IMAGE_DEPTH  = 65536,
+    parameter int    GAP_WIDTH    = 16,
+    parameter string IMAGE_PREFIX = "axi4s_image"
+) (
+    input  logic                       clk_i,
+    input  logic                       rst_i,
+
+    // Control
+    input  logic                       load_i,
+    input  logic [31:0]                image_id_i,
+    output logic                       done_o,
+
+    // AXI4-Stream Master Interface
+    output logic [AXI_WIDTH - 1:0]     tdata_o,
+    output logic                       tvalid_o,
+    input  logic                       tready_i,
+    output logic                       tlast_o,
+    output logic [AXI_WIDTH / 8 - 1:0] tkeep_o
+);
+
+    localparam int KEEP_WIDTH   = AXI_WIDTH / 8;
+    localparam int TLAST_IDX    = AXI_WIDTH + KEEP_WIDTH;
+    localparam int GAP_LSB      = TLAST_IDX + 1;
+    localparam int BEAT_IDX     = GAP_LSB + GAP_WIDTH;
+    localparam int VALID_IDX    = BEAT_IDX + 1;
+    localparam int RECORD_WIDTH = VALID_IDX + 1;
+
+    logic [RECORD_WIDTH - 1:0]        image_r [IMAGE_DEPTH];
+    logic [$clog2(IMAGE_DEPTH) - 1:0] idx_r;
+    logic [GAP_WIDTH - 1:0]           gap_r;
+    logic                             playing_r;
+    logic [RECORD_WIDTH - 1:0]        record_w;
+
+    string image_prefix;
+
+    initial begin
+        if (!$value$plusargs("AXI4S_IMAGE=%s", image_prefix)) image_prefix = IMAGE_PREFIX;
+    end
+
+    assign record_w = image_r[idx_r];
+
+    always @(posedge clk_i) begin
+        if (tvalid_o && tready_i) begin
+            tvalid_o <= 0;
+            tlast_o  <= 0;
+        end
+
+        if (load_i) begin
+            $readmemh($sformatf("%s_%08x.hex", image_prefix, image_id_i), image_r);
+            idx_r     <= 0;
+            gap_r     <= 0;
+            playing_r <= 1;
+            done_o    <= 0;
+            tvalid_o  <= 0;
+        end else if (playing_r && (!tvalid_o || tready_i)) begin
+            if (!record_w[VALID_IDX]) begin
+                playing_r <= 0;
+                done_o    <= 1;
+            end else if (gap_r != record_w[BEAT_IDX - 1 -: GAP_WIDTH]) begin
+                gap_r <= gap_r + 1;
+            end else begin
+                gap_r <= 0;
+                idx_r <= idx_r + 1;
+                if (record_w[BEAT_IDX]) begin
+                    tdata_o  <= record_w[AXI_WIDTH - 1:0];
+                    tkeep_o  <= record_w[TLAST_IDX - 1 -: KEEP_WIDTH];
+                    tlast_o  <= record_w[TLAST_IDX];
+                    tvalid_o <= 1;
+                end
+            end
+        end
+
+        if (rst_i) begin
+            tvalid_o  <= 0;
+            tlast_o   <= 0;
+            playing_r <= 0;
+            done_o    <= 0;
+        end
+    end
+
+endmodule
@@ -1,3 +1,5 @@
 from axi4stream_bus import AXI4SBus
-from axi4stream_driver import AXI4SDriver
-from axi4stream_monitor import AXI4SMonitor
\ No newline at end of file
+from axi4stream_packet import AXI4SPacket
+from axi4stream_driver import AXI4SDriver, axi4s_coverage_bins
+from axi4stream_monitor import AXI4SMonitor
+from axi4stream_image_driver import AXI4SImageBus, AXI4SImageDriver
\ No newline at end of file
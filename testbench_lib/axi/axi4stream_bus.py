@@ -7,4 +7,13 @@ class AXI4SBus(Bus):
         "tready",
         "tlast",
         "tkeep",
+        "tid",
+        "tdest",
+        "tuser",
+    )
+    optional_signals = (
+        "tkeep", # Without tkeep every beat is taken as full, the final one zero padded.
+        "tid",   # Sideband signals, carried by AXI4SPacket.
+        "tdest",
+        "tuser",
     )
@@ -1,9 +1,14 @@
-import random
-from typing import override
+from typing import override, Union
 from dataclasses import dataclass
-from cocotb.triggers import RisingEdge, ReadOnly
 from cocotb.handle import Immediate
-from testbench_lib.core import BaseDriver, Bytes
+from testbench_lib.core import BaseDriver, Bytes, Packet, CoverageBins, sim_cycles
+from axi4stream_packet import AXI4SPacket
+
+# Corner cases shared by the AXI4S driver and monitor. tkeep_<n> is the number of valid
+# bytes in the final beat of a packet, only tracked when the bus has tkeep.
+def axi4s_coverage_bins(name: str, byte_width: int, has_tkeep: bool = True) -> CoverageBins:
+    tkeep_bins = [f"tkeep_{n}" for n in range(1, byte_width + 1)] if has_tkeep else []
+    return CoverageBins(name, tkeep_bins + ["one_beat", "tlast_stall", "back_to_back"])
 
 @dataclass
 class AXI4SDriver(BaseDriver):
@@ -13,40 +18,99 @@ class AXI4SDriver(BaseDriver):
         assert self.axi_width % 8 == 0, "TDATA width must be an integer multiple of 8 bits"
         self.byte_width = self.axi_width // 8
 
+        self._has_tkeep = self.port.has("tkeep")
+        self._coverage = axi4s_coverage_bins("AXI4SDriver", self.byte_width, self._has_tkeep)
+        self._one_beat_bin = self._coverage.index("one_beat")
+        self._tlast_stall_bin = self._coverage.index("tlast_stall")
+        self._back_to_back_bin = self._coverage.index("back_to_back")
+        self._last_tlast_cycle = None
+        self._sideband = [name for name in AXI4SPacket.metadata if self.port.has(name)]
+
         self.port.tvalid.set(Immediate(0))
         self.port.tdata.set(Immediate(0))
         self.port.tlast.set(Immediate(0))
-        self.port.tkeep.set(Immediate(0))
+        if self._has_tkeep:
+            self.port.tkeep.set(Immediate(0))
+        for name in self._sideband:
+            getattr(self.port, name).set(Immediate(0))
+
+    # Packet size biased towards uncovered bins when coverage_directed is set. Only content is
+    # steered, handshake timing stays with the configured stall probabilities.
+    def packet_size(self, max_packet_size: int) -> int:
+        if self._config["coverage_directed"]:
+            uncovered = [b for b in self._coverage.uncovered if b.startswith("tkeep_") or b == "one_beat"]
+            if uncovered:
+                target = self._rng.choice(uncovered)
+                if target == "one_beat":
+                    return self._rng.randint(1, min(self.byte_width, max_packet_size))
+                keep = int(target.removeprefix("tkeep_"))
+                num_beats = self._rng.randint(0, max((max_packet_size - keep) // self.byte_width, 0))
+                return num_beats * self.byte_width + keep
+        return self._rng.randint(1, max_packet_size)
+
+    @override
+    def _begin_transaction(self, data: Union[Bytes, Packet]) -> None:
+        self._transaction = data
+        self._data = data.data if isinstance(data, Packet) else data
+        for name in self._sideband:
+            getattr(self.port, name).value = getattr(data, name, 0)
+        self._offset = 0
+        self._valid = False
+        self._present_beat()
+        if len(self._data) <= self.byte_width:
+            self._coverage.sample(self._one_beat_bin)
+
+    def _present_beat(self) -> None:
+        self._chunk = self._data[self._offset : self._offset + self.byte_width]
+        self._last = self._offset + self.byte_width >= len(self._data)
+        self._beat_pending = False
+
+        self.port.tdata.value = int.from_bytes(self._chunk.ljust(self.byte_width, b"\0"), "little")
+        self.port.tlast.value = int(self._last)
+        if self._has_tkeep:
+            self.port.tkeep.value = (1 << len(self._chunk)) - 1
 
     @override
-    async def _drive_transaction(self, data: Bytes):
-        offset = 0
-
-        while offset < len(data):
-            chunk = data[offset : offset + self.byte_width]
-            word = int.from_bytes(chunk.ljust(self.byte_width, b"\0"), "little")
-
-            self.port.tdata.value = word
-            self.port.tlast.value = int(offset + self.byte_width >= len(data))
-            self.port.tkeep.value = (1 << len(chunk)) - 1
-
-            while True:
-                self.port.tvalid.value = int(random.random() > self._config["driver_stall_probability"])
-                await ReadOnly()
-                if self.port.tvalid.value:
-                    break
-                await RisingEdge(self.clock)
-
-            # Wait for handshake.
-            while True:
-                if self.port.tready.value:
-                    break
-                await RisingEdge(self.clock)
-                await ReadOnly()
-
-            offset += self.byte_width
-            await RisingEdge(self.clock)
+    def _drive_cycle(self) -> None:
+        if self._beat_pending:
+            self._present_beat()
+
+        # tvalid is re-rolled every cycle until asserted, then held until the handshake.
+        if not self._valid:
+            self._valid = self._rng.random() > self._config["driver_stall_probability"]
+            self.port.tvalid.value = int(self._valid)
 
+    @override
+    def _sample_cycle(self) -> bool:
+        if not self._valid:
+            return False
+
+        cycle = sim_cycles(self._config)
+        if self._offset == 0 and self._last_tlast_cycle is not None and cycle - self._last_tlast_cycle == 1:
+            self._coverage.sample(self._back_to_back_bin)
+
+        if not self.port.tready.value:
+            if self._last:
+                self._coverage.sample(self._tlast_stall_bin)
+            return False
+
+        if self._offset == 0:
+            self._stamp_start(self._transaction)
+        self._throughput.record_beat(cycle, len(self._chunk))
+        if self._last:
+            if self._has_tkeep:
+                self._coverage.hit(f"tkeep_{len(self._chunk)}")
+            self._last_tlast_cycle = cycle
+            return True
+
+        self._offset += self.byte_width
+        self._valid = False
+        self._beat_pending = True
+        return False
+
+    @override
+    def _idle_bus(self) -> None:
         self.port.tvalid.value = 0
         self.port.tlast.value = 0
-        self.port.tkeep.value = 0
+        if self._has_tkeep:
+            self.port.tkeep.value = 0
@@ -0,0 +1,153 @@
+import os
+from typing import Any, Optional, override
+from dataclasses import dataclass, field
+
+import cocotb
+from cocotb.triggers import RisingEdge
+from cocotb.handle import Immediate
+from testbench_lib.core import BaseDriver, Bus, Bytes
+
+GAP_WIDTH = 16
+MAX_GAP = (1 << GAP_WIDTH) - 1
+
+class AXI4SImageBus(Bus):
+    signals = (
+        "tdata",
+        "load",
+        "id",
+        "done",
+    )
+
+# Packs the whole stimulus (beats, tkeep, tlast and idle gaps) into a memory image that is
+# played back by common_sim_lib/axi/axi4s_image_streamer.sv. Python only does the expected-side
+# bookkeeping, so there are no per-beat wakeups on the input side. Images larger than
+# image_depth (which must match the streamer's IMAGE_DEPTH) are played back in chunks.
+#
+# Each driver writes its own <image_prefix>_<id>.hex, claimed under a fresh id and passed to the
+# streamer on the id port, so runs sharing a working directory do not overwrite each other's
+# images. The +AXI4S_IMAGE plusarg overrides the prefix on both sides. The file is removed once
+# playback has finished.
+#
+# Beats are not observed from Python, so transactions carry no start_time and driver-side
+# throughput is not counted in this mode. Playback is a single task waiting on done, there are
+# no per-cycle hooks, so neither the tick scheduler nor run_direct() can drive it.
+@dataclass
+class AXI4SImageDriver(BaseDriver):
+    image_prefix: str = "axi4s_image"
+    image_depth: int = 65536
+
+    _image_path: Optional[str] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        self.axi_width = len(self.port.tdata)
+        assert self.axi_width % 8 == 0, "TDATA width must be an integer multiple of 8 bits"
+        self.byte_width = self.axi_width // 8
+
+        self._tlast_shift = self.axi_width + self.byte_width
+        self._gap_shift = self._tlast_shift + 1
+        self._beat_bit = 1 << (self._gap_shift + GAP_WIDTH)
+        self._valid_bit = self._beat_bit << 1
+        self._record_digits = (self._gap_shift + GAP_WIDTH + 2 + 3) // 4
+
+        self.port.load.set(Immediate(0))
+        self.port.id.set(Immediate(0))
+
+    # As AXI4SDriver.packet_size, without coverage to steer towards.
+    def packet_size(self, max_packet_size: int) -> int:
+        return self._rng.randint(1, max_packet_size)
+
+    def _record(self, gap: int, beat: bool = False, data: bytes = b"", last: bool = False) -> int:
+        record = self._valid_bit | (gap << self._gap_shift)
+        if beat:
+            record |= self._beat_bit | (int(last) << self._tlast_shift)
+            record |= ((1 << len(data)) - 1) << self.axi_width
+            record |= int.from_bytes(data, "little")
+        return record
+
+    def _stall_cycles(self) -> int:
+        cycles = 0
+        while self._rng.random() < self._config["driver_stall_probability"]:
+            cycles += 1
+        return cycles
+
+    def _pack_transaction(self, data: Bytes, gap: int, records: list[int]) -> None:
+        offset = 0
+        while offset < len(data):
+            gap += self._stall_cycles()
+            while gap > MAX_GAP:
+                records.append(self._record(MAX_GAP))
+                gap -= MAX_GAP + 1
+            chunk = data[offset : offset + self.byte_width]
+            records.append(self._record(gap, True, chunk, offset + self.byte_width >= len(data)))
+            gap = 0
+            offset += self.byte_width
+
+    # Ids come from os.urandom rather than the seeded stream, which would hand two runs with the
+    # same seed the same file.
+    def _claim_image(self) -> None:
+        prefix = cocotb.plusargs.get("AXI4S_IMAGE", self.image_prefix)
+        while True:
+            image_id = int.from_bytes(os.urandom(4), "little")
+            path = f"{prefix}_{image_id:08x}.hex"
+            try:
+                open(path, "x").close()
+                break
+            except FileExistsError:
+                continue
+        self._image_path = path
+        self.port.id.value = image_id
+
+    def _release_image(self) -> None:
+        if self._image_path is not None and os.path.exists(self._image_path):
+            os.remove(self._image_path)
+        self._image_path = None
+
+    async def _play(self, records: list[int]) -> None:
+        if self._image_path is None:
+            self._claim_image()
+        with open(self._image_path, "w") as f:
+            for record in records:
+                f.write(f"{record:0{self._record_digits}x}\n")
+            f.write("0" * self._record_digits + "\n")
+
+        self.port.load.value = 1
+        await RisingEdge(self.clock)
+        self.port.load.value = 0
+        await RisingEdge(self.port.done)
+
+    @override
+    def set_config(self, config: dict[str, Any]):
+        if config["scheduler"] != "tasks":
+            raise ValueError(f"AXI4SImageDriver requires the 'tasks' scheduler, got '{config['scheduler']}'")
+        super().set_config(config)
+
+    @override
+    async def _send(self) -> None:
+        pre_delay_range: range = self._config["driver_pre_delay_range"]
+        post_delay_range: range = self._config["driver_post_delay_range"]
+        records: list[int] = []
+        gap = 0
+
+        try:
+            for transaction in self._transaction_queue:
+                if self._stop_requested:
+                    break
+
+                gap += self._idle_cycles(pre_delay_range)
+                self.expect_callback(transaction)
+                packed: list[int] = []
+                self._pack_transaction(transaction, gap, packed)
+                gap = self._idle_cycles(post_delay_range)
+
+                # One record is reserved for the terminator.
+                if len(packed) > self.image_depth - 1:
+                    raise ValueError(f"Transaction needs {len(packed)} records, image depth is {self.image_depth}")
+                if len(records) + len(packed) > self.image_depth - 1:
+                    await self._play(records)
+                    records = []
+                records.extend(packed)
+
+            if records:
+                await self._play(records)
+        finally:
+            self._release_image()
@@ -1,38 +1,149 @@
-from random import random
 from typing import override
+from dataclasses import dataclass
 
-from cocotb.triggers import RisingEdge, ReadOnly
-from testbench_lib.core import BaseMonitor, Bytes
+import cocotb
+from cocotb.triggers import RisingEdge, ReadOnly, ValueChange, Event
+from testbench_lib.core import BaseMonitor, Bytes, Fragment, sim_cycles, sim_time
+from axi4stream_driver import axi4s_coverage_bins
+from axi4stream_packet import AXI4SPacket
 
 
+@dataclass
 class AXI4SMonitor(BaseMonitor):
 
+    def __post_init__(self):
+        self._has_tkeep = self.port.has("tkeep")
+        self._coverage = axi4s_coverage_bins("AXI4SMonitor", len(self.port.tdata) // 8, self._has_tkeep)
+        self._one_beat_bin = self._coverage.index("one_beat")
+        self._tlast_stall_bin = self._coverage.index("tlast_stall")
+        self._back_to_back_bin = self._coverage.index("back_to_back")
+        self._last_tlast_cycle = None
+        self._in_packet = False
+        self._full_mask = (1 << (len(self.port.tdata) // 8)) - 1
+        self._wake_task = None
+        self._parked = Event()
+        self._sideband = [name for name in AXI4SPacket.metadata if self.port.has(name)]
+
+    def _ready(self) -> int:
+        return int(self._rng.random() > self._config["monitor_stall_probability"])
+
+    def _begin_packet(self) -> None:
+        self._in_packet = True
+        self._received = bytearray()
+        self._offset = 0
+        self._start_time = None
+        self._num_beats = 0
+
+        cycle = sim_cycles(self._config)
+        if self._last_tlast_cycle is not None and cycle - self._last_tlast_cycle == 1:
+            self._coverage.sample(self._back_to_back_bin)
+
+    def _end_packet(self) -> None:
+        self._in_packet = False
+        if self._config["monitor_streaming"]:
+            return
+        if self._sideband:
+            transaction = AXI4SPacket(bytes(self._received), **self._metadata)
+        else:
+            transaction = Bytes(self._received)
+        transaction.start_time = self._start_time
+        transaction.end_time = sim_time(self._config)
+        self.receive_callback(transaction)
+
+    # ReadOnly phase. Returns False while the bus is idle between packets.
+    def _sample(self) -> bool:
+        if not self._in_packet:
+            if not self.port.tvalid.value:
+                return False
+            self._begin_packet()
+
+        if self.port.tvalid.value and self.port.tready.value:
+            mask: int = self.port.tkeep.value.to_unsigned() if self._has_tkeep else self._full_mask
+            word_bytes = self.port.tdata.value.to_bytes(byteorder="little")
+            if mask != self._full_mask:
+                word_bytes = bytes(word_bytes[i] for i in range(len(word_bytes)) if (mask >> i) & 1)
+
+            cycle = sim_cycles(self._config)
+            last = bool(self.port.tlast.value)
+            if self._start_time is None:
+                self._start_time = sim_time(self._config)
+                self._metadata = {name: getattr(self.port, name).value.to_unsigned() for name in self._sideband}
+
+            # Streaming hands each beat straight on, so nothing is held beyond the bus width.
+            if self._config["monitor_streaming"]:
+                self.receive_callback(Fragment(word_bytes, self._offset, last, cycle, self._start_time))
+                self._offset += len(word_bytes)
+            else:
+                self._received += word_bytes
+
+            self._num_beats += 1
+            self._throughput.record_beat(cycle, mask.bit_count())
+
+            if last: # End of packet
+                if self._has_tkeep:
+                    self._coverage.hit(f"tkeep_{mask.bit_count()}")
+                if self._num_beats == 1:
+                    self._coverage.sample(self._one_beat_bin)
+                self._last_tlast_cycle = sim_cycles(self._config)
+                self._end_packet()
+
+        elif self.port.tvalid.value and self.port.tlast.value:
+            self._coverage.sample(self._tlast_stall_bin)
+
+        return True
+
     @override
-    async def _receive(self) -> Bytes:
+    async def _receive(self) -> None:
+        wait_for_edge = True
         while True:
-            await RisingEdge(self.clock)
-            self.port.tready.value = int(random() > self._config["monitor_stall_probability"])
+            if wait_for_edge:
+                await RisingEdge(self.clock)
+            wait_for_edge = True
+            self.port.tready.value = self._ready()
             await ReadOnly()
 
-            if self.port.tvalid.value: # Start of packet
-                received_words = bytearray()
-                while True:
+            if not self._sample() and self._config["monitor_idle_wakeup"]:
+                # Sleep until the bus becomes active instead of sampling every idle cycle. tvalid
+                # changes just after an edge, so on wakeup we are already inside the cycle in which
+                # it is presented and tready must be driven before the next edge.
+                await ValueChange(self.port.tvalid)
+                wait_for_edge = False
 
-                    if self.port.tvalid.value and self.port.tready.value:
-                        mask: int = self.port.tkeep.value.to_unsigned()
-                        word_bytes = Bytes(self.port.tdata.value.to_bytes(byteorder="little"))
+    # ------------------------------------------------------------------
+    #  Tick scheduler entry points
+    # ------------------------------------------------------------------
 
-                        for i in range(len(word_bytes)):
-                            if (mask >> i) & 1:
-                                received_words.append(word_bytes[i])
-
-                    if self.port.tlast.value and self.port.tready.value: break # End of packet
+    @override
+    def tick_drive(self) -> None:
+        self.port.tready.value = self._ready()
 
-                    await RisingEdge(self.clock)
-                    self.port.tready.value = random() > self._config["monitor_stall_probability"]
-                    await ReadOnly()
+    @override
+    def tick_sample(self) -> None:
+        if not self._sample() and self._config["monitor_idle_wakeup"]:
+            if not self._scheduler.park_until_active(self, self.port.tvalid):
+                self._scheduler.park(self)
+                self._parked.set()
+                if self._wake_task is None:
+                    self._wake_task = cocotb.start_soon(self._wake_on_activity())
 
-                self.receive_callback(Bytes(received_words))
+    @override
+    def cancel(self) -> None:
+        super().cancel()
+        if self._wake_task is not None and not self._wake_task.done():
+            self._wake_task.cancel()
+        self._wake_task = None
+        self._parked.clear()
+        self._parked = Event()
 
-            else:
-                continue
+    # Off the dispatch list while idle. The cycle in which tvalid rises is handled here, as in
+    # _receive, before handing back to the dispatcher from the next edge on. One task serves
+    # every idle period, waiting on _parked in between.
+    async def _wake_on_activity(self) -> None:
+        while True:
+            await self._parked.wait()
+            await ValueChange(self.port.tvalid)
+            self.tick_drive()
+            await ReadOnly()
+            if self._sample():
+                self._parked.clear()
+                self._scheduler.arm(self)
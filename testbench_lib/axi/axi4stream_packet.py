@@ -0,0 +1,7 @@
+from testbench_lib.core import Packet
+
+# AXI4S packet with the optional sideband signals. AXI4SDriver holds tid, tdest and tuser for
+# every beat of the packet and AXI4SMonitor takes them from the first beat.
+class AXI4SPacket(Packet):
+    __slots__ = ("tid", "tdest", "tuser")
+    metadata = ("tid", "tdest", "tuser")
@@ -1,5 +1,10 @@
 from base_driver import BaseDriver
 from base_monitor import BaseMonitor
 from base_scoreboard import BaseScoreboard
-from base_environment import BaseEnvironment, ResetSequence, BASE_CONFIG
-from base_types import Bytes, Module, Bus
\ No newline at end of file
+from base_environment import BaseEnvironment, ResetSequence, BASE_CONFIG, run_environments
+from base_types import Bytes, Packet, PacketBatch, Fragment, Module, Bus
+from base_statistics import LatencyHistogram, ThroughputCounter, OfferedLoad, sim_cycle, sim_cycles, sim_time, set_time_source
+from base_coverage import CoverageBins, save_coverage, load_coverage, merge_coverage_files
+from base_scheduler import TickScheduler, DirectScheduler
+from base_probe import Probe, ProbeSet, resolve_path, save_probes
+from base_pcap import PcapPacket, read_pcap, pcap_replay
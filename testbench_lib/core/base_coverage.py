@@ -0,0 +1,96 @@
+import json
+from array import array
+from typing import Iterable, Sequence
+
+# ------------------------------------------------------------------
+#  Functional coverage
+# ------------------------------------------------------------------
+
+# Hit counters for a fixed set of named bins. Components resolve bin indices once and
+# then sample by index so the per-event cost is a single array increment.
+class CoverageBins:
+
+    def __init__(self, name: str, bins: Sequence[str], goal: int = 1):
+        assert bins, "Coverage group must define at least one bin"
+        assert goal > 0
+        self.name: str = name
+        self.goal: int = goal
+        self._bins: tuple[str, ...] = tuple(bins)
+        self._index: dict[str, int] = {bin_name: idx for idx, bin_name in enumerate(self._bins)}
+        self._hits: array = array("Q", bytes(8 * len(self._bins)))
+
+    def index(self, bin_name: str) -> int:
+        return self._index[bin_name]
+
+    def sample(self, idx: int) -> None:
+        self._hits[idx] += 1
+
+    def hit(self, bin_name: str) -> None:
+        self._hits[self._index[bin_name]] += 1
+
+    def hits(self, bin_name: str) -> int:
+        return self._hits[self._index[bin_name]]
+
+    def is_covered(self, bin_name: str) -> bool:
+        return self._hits[self._index[bin_name]] >= self.goal
+
+    @property
+    def bins(self) -> tuple[str, ...]:
+        return self._bins
+
+    @property
+    def uncovered(self) -> list[str]:
+        return [bin_name for bin_name, hits in zip(self._bins, self._hits) if hits < self.goal]
+
+    @property
+    def closed(self) -> bool:
+        return all(hits >= self.goal for hits in self._hits)
+
+    @property
+    def percent(self) -> float:
+        covered = sum(1 for hits in self._hits if hits >= self.goal)
+        return 100.0 * covered / len(self._bins)
+
+    def merge(self, other: "CoverageBins") -> None:
+        if other._bins != self._bins:
+            raise ValueError(f"Cannot merge coverage '{other.name}' into '{self.name}': bin sets differ")
+        for idx, hits in enumerate(other._hits):
+            self._hits[idx] += hits
+
+    def to_dict(self) -> dict:
+        return {"goal": self.goal, "bins": dict(zip(self._bins, self._hits))}
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict) -> "CoverageBins":
+        coverage = cls(name, list(data["bins"].keys()), data["goal"])
+        for idx, hits in enumerate(data["bins"].values()):
+            coverage._hits[idx] = hits
+        return coverage
+
+    def summary(self) -> str:
+        uncovered = self.uncovered
+        return f"{self.percent:.0f}% ({len(self._bins) - len(uncovered)}/{len(self._bins)} bins)" + (
+            f" uncovered: {', '.join(uncovered)}" if uncovered else ""
+        )
+
+
+def save_coverage(path: str, groups: Iterable[CoverageBins]) -> None:
+    with open(path, "w") as f:
+        json.dump({group.name: group.to_dict() for group in groups}, f, indent=2)
+
+
+def load_coverage(path: str) -> dict[str, CoverageBins]:
+    with open(path) as f:
+        return {name: CoverageBins.from_dict(name, data) for name, data in json.load(f).items()}
+
+
+# Merge the coverage files written by parallel runs (e.g. one per parametrize cell).
+def merge_coverage_files(paths: Iterable[str]) -> dict[str, CoverageBins]:
+    merged: dict[str, CoverageBins] = {}
+    for path in paths:
+        for name, group in load_coverage(path).items():
+            if name in merged:
+                merged[name].merge(group)
+            else:
+                merged[name] = group
+    return merged
@@ -1,51 +1,226 @@
-from random import randint
-from collections import deque
-from typing import Callable, Any, Union
-from abc import abstractmethod
+import random
+from typing import Callable, Any, Iterable, Iterator, Optional, Union
 from dataclasses import dataclass, field
 
 import cocotb
-from cocotb.triggers import RisingEdge
+from cocotb.triggers import RisingEdge, ReadOnly, ClockCycles, Event
 from cocotb.task import Task
 from cocotb.clock import Clock
 from cocotb.handle import LogicObject, LogicArrayObject
 
+from base_statistics import ThroughputCounter, OfferedLoad, sim_cycle, sim_time
+from base_coverage import CoverageBins
+
 @dataclass
 class BaseDriver:
     clock: Clock
     port: Union[LogicObject, LogicArrayObject]
     expect_callback: Callable[[Any], None]
 
-    _transaction_queue: deque[Any] = field(default=None, init=False, repr=False)
+    _transaction_queue: Iterator[Any] = field(default=None, init=False, repr=False)
     _task: Task = field(default=None, init=False, repr=False)
     _config: dict[str, Any] = field(default=None, init=False, repr=False)
+    _throughput: ThroughputCounter = field(default_factory=ThroughputCounter, init=False, repr=False)
+    _coverage: Optional[CoverageBins] = field(default=None, init=False, repr=False)
+    _stop_requested: bool = field(default=False, init=False, repr=False)
+    _offered: OfferedLoad = field(default_factory=OfferedLoad, init=False, repr=False)
+    _origin_cycle: Optional[int] = field(default=None, init=False, repr=False)
+    _rng: Any = field(default=random, init=False, repr=False)
+
+    # Tick scheduler state, see TickScheduler.
+    _scheduler: Any = field(default=None, init=False, repr=False)
+    _current: Any = field(default=None, init=False, repr=False)
+    _next: Any = field(default=None, init=False, repr=False)
+    _post_delay: int = field(default=0, init=False, repr=False)
+    _finished: Event = field(default_factory=Event, init=False, repr=False)
+
+    @property
+    def throughput(self) -> ThroughputCounter:
+        return self._throughput
+
+    # Random stream for stalls, gaps and stimulus, the environment's once set_rng has been called.
+    @property
+    def rng(self) -> random.Random:
+        return self._rng
+
+    def set_rng(self, rng: random.Random) -> None:
+        self._rng = rng
+
+    @property
+    def offered(self) -> OfferedLoad:
+        return self._offered
+
+    @property
+    def coverage(self) -> Optional[CoverageBins]:
+        return self._coverage
+
+    @property
+    def running(self) -> bool:
+        if self._scheduler is not None:
+            return not self._finished.is_set()
+        return self._task is not None and not self._task.done()
+
+    # A transaction has been started and not yet completed.
+    @property
+    def busy(self) -> bool:
+        return self._current is not None
 
-    def load_transaction_queue(self, transactions: list[Any]) -> None:
-        self._transaction_queue = deque(transactions)
+    @property
+    def supports_tick(self) -> bool:
+        return type(self)._drive_cycle is not BaseDriver._drive_cycle
+
+    # Accepts a list or a lazy iterator, the latter lets generators react to coverage as it is collected.
+    def load_transaction_queue(self, transactions: Iterable[Any]) -> None:
+        self._transaction_queue = iter(transactions)
+
+    # ------------------------------------------------------------------
+    #  Per-cycle hooks. A driver implementing these runs under both the
+    #  task based and the tick scheduled environment.
+    # ------------------------------------------------------------------
+
+    def _begin_transaction(self, transaction: Any) -> None:
+        raise NotImplementedError
+
+    # Write phase, called once per cycle after the rising edge.
+    def _drive_cycle(self) -> None:
+        raise NotImplementedError
+
+    # ReadOnly phase, returns True once the transaction has completed.
+    def _sample_cycle(self) -> bool:
+        raise NotImplementedError
+
+    def _idle_bus(self) -> None:
+        raise NotImplementedError
 
-    @abstractmethod
     async def _drive_transaction(self, transaction: Any) -> None:
-        pass
+        self._begin_transaction(transaction)
+        while True:
+            self._drive_cycle()
+            await ReadOnly()
+            done = self._sample_cycle()
+            await RisingEdge(self.clock)
+            if done:
+                break
+        self._idle_bus()
+
+    def _idle_cycles(self, delay_range: range) -> int:
+        return self._rng.randint(delay_range.start, delay_range.stop)
+
+    # Transactions carrying an arrival_cycle (e.g. PcapPacket) are held until that cycle, counted
+    # from the first one, instead of taking a random gap. A transaction that is already late goes
+    # straight out and the lateness is recorded against the offered load.
+    def _pre_delay_cycles(self, transaction: Any) -> int:
+        arrival_cycle = getattr(transaction, "arrival_cycle", None)
+        if arrival_cycle is None:
+            return self._idle_cycles(self._config["driver_pre_delay_range"])
+
+        cycle = sim_cycle(self._config)
+        if self._origin_cycle is None:
+            self._origin_cycle = cycle - arrival_cycle
+        delay = self._origin_cycle + arrival_cycle - cycle
+        self._offered.record(arrival_cycle, len(transaction), max(-delay, 0))
+        return max(delay, 0)
+
+    def _post_delay_cycles(self, transaction: Any) -> int:
+        if getattr(transaction, "arrival_cycle", None) is not None:
+            return 0
+        return self._idle_cycles(self._config["driver_post_delay_range"])
+
+    # Called by the driver when the first beat of a transaction is accepted, as the monitor
+    # stamps its first accepted beat, so latency leaves out the driver's own pre-handshake stalls.
+    def _stamp_start(self, transaction: Any) -> None:
+        if hasattr(transaction, "start_time"):
+            transaction.start_time = sim_time(self._config)
+
+    def _stamp_end(self, transaction: Any) -> None:
+        if hasattr(transaction, "end_time"):
+            transaction.end_time = sim_time(self._config)
 
     async def _send(self) -> None:
-        pre_delay_range: range = self._config["driver_pre_delay_range"]
-        post_delay_range: range = self._config["driver_post_delay_range"]
-        while self._transaction_queue:
-            for _ in range(randint(pre_delay_range.start, pre_delay_range.stop)):
-                await RisingEdge(self.clock)
+        for transaction in self._transaction_queue:
+            if self._stop_requested:
+                break
+
+            # Idle gaps are waited out in one trigger however long they are.
+            if delay := self._pre_delay_cycles(transaction):
+                await ClockCycles(self.clock, delay)
+                # A stop() during the gap drops the transaction that was waiting on it.
+                if self._stop_requested:
+                    break
+
+            self._current = transaction
+            self.expect_callback(transaction)
+            await self._drive_transaction(transaction)
+            self._stamp_end(transaction)
+            self._current = None
+
+            if delay := self._post_delay_cycles(transaction):
+                await ClockCycles(self.clock, delay)
+
+        self._finished.set()
 
-            self.expect_callback(self._transaction_queue[0])
-            await self._drive_transaction(self._transaction_queue.popleft())
+    # ------------------------------------------------------------------
+    #  Tick scheduler entry points
+    # ------------------------------------------------------------------
 
-            for _ in range(randint(post_delay_range.start, post_delay_range.stop)):
-                await RisingEdge(self.clock)
+    def tick_drive(self) -> None:
+        if self._current is None:
+            if self._next is None:
+                self._idle_bus()
+                if not self._stop_requested:
+                    self._next = next(self._transaction_queue, None)
+                if self._next is not None:
+                    delay = self._post_delay + self._pre_delay_cycles(self._next)
+                    self._post_delay = 0
+                    if delay:
+                        self._scheduler.sleep(self, delay)
+                        return
+
+            # As in _send, a stop() during the gap drops the transaction that was waiting on it.
+            if self._next is None or self._stop_requested:
+                self._next = None
+                self._scheduler.park(self)
+                self._finished.set()
+                return
+
+            self._current, self._next = self._next, None
+            self.expect_callback(self._current)
+            self._begin_transaction(self._current)
+
+        self._drive_cycle()
+
+    def tick_sample(self) -> None:
+        if self._current is not None and self._sample_cycle():
+            self._stamp_end(self._current)
+            self._post_delay = self._post_delay_cycles(self._current)
+            self._current = None
+
+    # ------------------------------------------------------------------
 
     def set_config(self, config: dict[str, Any]):
         assert isinstance(config, dict)
         self._config = config
+        if self._coverage is not None:
+            self._coverage.goal = config["coverage_goal"]
 
     def start(self) -> None:
-        if not self._transaction_queue:
+        if self._transaction_queue is None:
             raise RuntimeError("Transaction queue not loaded.")
-        if self._task is None:
+        if self._scheduler is not None:
+            self._scheduler.arm(self)
+        elif self._task is None:
             self._task = cocotb.start_soon(self._send())
+
+    # Finish the transaction in flight, then stop pulling from the queue.
+    def stop(self) -> None:
+        self._stop_requested = True
+
+    # Abandon the run immediately, see BaseEnvironment.stop.
+    def cancel(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def wait_finished(self) -> None:
+        if self.running:
+            await self._finished.wait()
@@ -1,16 +1,25 @@
-from typing import Callable, Any
+import random
+import logging
+from typing import Callable, Any, Optional
 from dataclasses import dataclass
 
 from base_driver import BaseDriver
 from base_monitor import BaseMonitor
 from base_scoreboard import BaseScoreboard
+from base_coverage import CoverageBins, save_coverage
+from base_scheduler import TickScheduler, DirectScheduler
+from base_probe import ProbeSet, save_probes
+from base_types import Bus
+from base_statistics import sim_cycles
 
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, ClockCycles, Combine
+from cocotb.triggers import RisingEdge, ClockCycles, Combine, First
 from cocotb.task import Task
 from cocotb.handle import LogicObject
 
+log = logging.getLogger("cocotb.environment")
+
 BASE_CONFIG: dict[str, Any] = {
     "scoreboard_expected_matches" : None,
     "clock_period"                : 10,
@@ -19,6 +28,61 @@ BASE_CONFIG: dict[str, Any] = {
     "monitor_stall_probability"   : 0,
     "driver_pre_delay_range"      : range(0, 10),
     "driver_post_delay_range"     : range(0, 10),
+    "monitor_idle_wakeup"         : True, # Monitors sleep on tvalid while the bus is idle.
+    "monitor_streaming"           : False, # Monitors pass each beat on as a Fragment instead of whole packets.
+
+    # "tasks": every driver and monitor runs as its own cocotb task awaiting its own triggers.
+    # "tick":  a single TickScheduler awaits each edge once and steps the active components.
+    "scheduler"                   : "tasks",
+
+    # Performance measurement. Bounds left as None are reported but not enforced.
+    "scoreboard_latency_histogram_bins" : 256,
+    "scoreboard_max_latency_cycles"     : None,
+    "min_beats_per_cycle"               : None,
+
+    # Functional coverage. With coverage_terminate the run ends once every bin reaches
+    # coverage_goal hits (or the drivers run dry) rather than after scoreboard_expected_matches.
+    "coverage_goal"                     : 1,
+    "coverage_directed"                 : False,
+    "coverage_terminate"                : False,
+    "coverage_check_interval"           : 100,
+    "coverage_output"                   : None,
+
+    # Reference model execution. With workers > 0 the scoreboard runs process_transaction_callback
+    # in a worker pool, batched and submitted up to scoreboard_model_lookahead transactions ahead of
+    # the drivers, or at the driver's pace with coverage_directed. The "process" executor needs a
+    # picklable (module level) callback.
+    "scoreboard_model_workers"          : 0,
+    "scoreboard_model_executor"         : "process",
+    "scoreboard_model_batch_size"       : 64,
+    "scoreboard_model_lookahead"        : 512,
+    "scoreboard_model_poll_cycles"      : 16,
+
+    # Internal probes, see ProbeSet. Periodic probes are sampled every probe_interval cycles
+    # into rings of probe_depth samples; histograms cover values 0..probe_histogram_bins-1.
+    "probe_interval"                    : 1,
+    "probe_depth"                       : 1024,
+    "probe_histogram_bins"              : 64,
+    "probe_output"                      : None,
+
+    # Timestamp-paced capture replay, see pcap_replay. Capture time is mapped onto cycles as if the
+    # bus carried pcap_line_rate_bps, then compressed by pcap_speedup.
+    "pcap_line_rate_bps"                : 10e9,
+    "pcap_speedup"                      : 1.0,
+
+    # Progress watchdog. The run fails once nothing has been expected, received, matched or
+    # accepted on any interface for watchdog_cycles while work is still outstanding, with a dump
+    # of the bus signals, queue depths and the last watchdog_history transactions each way.
+    # None (the default) disables it and leaves only timeout_cycles.
+    "watchdog_cycles"                   : None,
+    "watchdog_check_interval"           : 500,
+    "watchdog_history"                  : 4,
+
+    # Seed of the environment's random stream, shared by its drivers and monitors and logged at
+    # start. None draws one from Python's random module, which cocotb seeds from RANDOM_SEED
+    # (COCOTB_RANDOM_SEED) and the cocotb_worker per job. Environments run together by
+    # run_environments mix their name into the seed, so each copy gets its own stream.
+    "random_seed"                       : None,
 }
 
 @dataclass
@@ -36,6 +100,12 @@ class ResetSequence:
     def start(self) -> Task:
         return cocotb.start_soon(self._reset_sequence())
 
+def _format_value(value: Any) -> str:
+    try:
+        return hex(int(value))
+    except ValueError:
+        return str(value)
+
 class BaseEnvironment:
 
     def __init__(self):
@@ -45,13 +115,28 @@ class BaseEnvironment:
         self._driver_transaction_generators: dict[str, BaseDriver] = {}
         self._monitors: dict[str, BaseMonitor] = {}
         self._resets: list[ResetSequence] = []
+        self._probes: list[ProbeSet] = []
         self._clock: LogicObject
+        self._scheduler: TickScheduler = None
+        self._clock_task: Task = None
+        self._name: str = ""
+        self._log: logging.Logger = log
+        self._watchdog_progress: tuple = ()
+        self._watchdog_cycle: float = 0
+        self._watchdog_task: Task = None
+        self._rng: random.Random = random.Random()
 
     def set_configuration(self, config: dict[str, Any]) -> None:
         self._config = config
 
+    # Tells environments sharing a simulation apart in logs and failures, see run_environments.
+    def set_name(self, name: str) -> None:
+        self._name = name
+        self._log = logging.getLogger(f"{log.name}.{name}")
+
+    # A cocotb handle, or a DirectSignal for run_direct().
     def set_clock(self, clock: LogicObject):
-        assert isinstance(clock, LogicObject)
+        assert hasattr(clock, "value")
         self._clock = clock
 
     def add_reset(self, reset_sequence: ResetSequence) -> None:
@@ -62,31 +147,350 @@ class BaseEnvironment:
         assert isinstance(driver, BaseDriver)
         assert callable(transaction_generator)
         self._drivers[name] = driver
+        if driver.coverage is not None:
+            driver.coverage.name = name
         self._driver_transaction_generators[name] = transaction_generator
 
     def set_scoreboard(self, scoreboard) -> None:
         assert isinstance(scoreboard, BaseScoreboard)
         self._scoreboard = scoreboard
 
+    def add_probes(self, probes: ProbeSet) -> None:
+        assert isinstance(probes, ProbeSet)
+        self._probes.append(probes)
+
     def add_monitor(self, name: str, monitor: BaseMonitor) -> None:
         assert isinstance(monitor, BaseMonitor)
         self._monitors[name] = monitor
+        if monitor.coverage is not None:
+            monitor.coverage.name = name
 
     async def run(self) -> None:
-        cocotb.start_soon(Clock(self._clock, self._config["clock_period"], self._config["timescale"]).start(start_high=False))
+        self._start_clock()
+        try:
+            self._start_components()
+            await self._reset()
+            await self._run_body()
+            self._finish()
+        finally:
+            self.stop()
+
+    def _start_clock(self) -> None:
+        clock = Clock(self._clock, self._config["clock_period"], self._config["timescale"])
+        self._clock_task = cocotb.start_soon(clock.start(start_high=False))
 
+    # Cancels the clock and every component task so the simulator can be reused for another run,
+    # e.g. by the cocotb_worker. Safe to call more than once.
+    def stop(self) -> None:
+        if self._clock_task is not None and not self._clock_task.done():
+            self._clock_task.cancel()
+        self._clock_task = None
+        if isinstance(self._scheduler, TickScheduler):
+            self._scheduler.stop()
+        for component in list(self._drivers.values()) + list(self._monitors.values()) + self._probes:
+            component.cancel()
+        self._scoreboard.close()
+
+    def _seed_random(self) -> None:
+        seed = self._config["random_seed"]
+        if seed is None:
+            seed = random.getrandbits(32)
+        self._rng = random.Random(f"{seed}/{self._name}" if self._name else seed)
+        self._log.info(f"Random seed {seed}" + (f" (stream {seed}/{self._name})" if self._name else ""))
+
+    # Seeds the run and configures the scoreboard, ahead of any component starting.
+    def _configure(self) -> None:
+        self._seed_random()
         self._scoreboard.set_config(self._config)
+        if self._name:
+            self._scoreboard.name = f"Scoreboard {self._name}"
 
-        for monitor in self._monitors.values():
-            monitor.set_config(self._config)
-            monitor.start()
+    # A shared scheduler is passed in by run_environments.
+    def _start_components(self, scheduler: Optional[TickScheduler] = None) -> None:
+        self._configure()
+
+        if self._config["scheduler"] == "tick":
+            self._scheduler = scheduler or TickScheduler(self._clock, self._config)
+            for component in list(self._drivers.values()) + list(self._monitors.values()) + self._probes:
+                if component.supports_tick:
+                    self._scheduler.register(component)
+            self._scheduler.start()
+
+        self._start_monitors()
 
+    async def _reset(self) -> None:
         tasks = [reset.start() for reset in self._resets]
         await Combine(*tasks)
 
+    # run_direct() holds every reset for the longest sequence, there is one clock to step.
+    def _reset_cycles(self) -> int:
+        return max((reset.num_cycles for reset in self._resets), default=0)
+
+    def _set_resets(self, value: int) -> None:
+        for reset in self._resets:
+            reset.reset.value = value
+
+    async def _run_body(self) -> None:
+        self._start_drivers()
+
+        if self._config["coverage_terminate"]:
+            await self._run_with_watchdog(self._run_until_coverage_closed())
+        else:
+            await self._run_with_watchdog(self._scoreboard.start())
+
+    def _finish(self) -> None:
+        self._scoreboard.close()
+        self.report()
+
+    # Runs the body and report of one of several environments, returning the failure if any
+    # so the others are left to finish.
+    async def _run_isolated(self) -> Optional[Exception]:
+        try:
+            await self._run_body()
+            self._finish()
+        except Exception as error:
+            self._log.error(f"Failed: {error}")
+            return error
+        return None
+
+    # Runs against an in-process model (testbench_lib.verilator.VerilatorModel) rather than under
+    # cocotb, stepped by a DirectScheduler. Every driver and monitor must implement the tick hooks.
+    # Idle monitors are parked on a watched signal, so the model free-runs whenever nothing is
+    # being driven, and the reference model runs inline.
+    def run_direct(self, model: Any) -> None:
+        if self._config["scoreboard_model_workers"]:
+            raise ValueError("scoreboard_model_workers is not supported by run_direct()")
+        if self._probes:
+            raise ValueError("Probes are not supported by run_direct()")
+        components = list(self._drivers.items()) + list(self._monitors.items())
+        for name, component in components:
+            if not component.supports_tick:
+                raise ValueError(f"{name} does not implement the tick hooks required by run_direct()")
+
+        self._configure()
+
+        self._scheduler = DirectScheduler(model, self._config)
+        for _, component in components:
+            self._scheduler.register(component)
+        self._scheduler.start()
+        try:
+            self._start_monitors()
+
+            self._set_resets(1)
+            self._scheduler.run(self._reset_cycles())
+            self._set_resets(0)
+            self._scheduler.run(1)
+
+            self._start_drivers()
+            self._watchdog_reset()
+            if self._config["coverage_terminate"]:
+                self._run_direct_until(self._coverage_closed)
+                self._stop_drivers()
+                self._run_direct_until(self._drivers_finished)
+                self._run_direct_until(lambda: self._scoreboard.drained)
+            else:
+                self._run_direct_until(lambda: self._scoreboard.done)
+            self._scoreboard.check()
+        finally:
+            self._scheduler.stop()
+
+        self._finish()
+
+    # Steps the model until condition holds, failing early on a scoreboard mismatch or, if
+    # enabled, a watchdog stall.
+    def _run_direct_until(self, condition: Callable[[], bool]) -> None:
+        def check() -> None:
+            self._scoreboard.check()
+            if self._config["watchdog_cycles"] is not None:
+                self._watchdog_check()
+
+        self._scheduler.run_until(
+            lambda: condition() or self._scoreboard.failed,
+            self._config["coverage_check_interval"], self._config["timeout_cycles"], check,
+        )
+        self._scoreboard.check()
+
+    def _start_monitors(self) -> None:
+        for probes in self._probes:
+            probes.set_config(self._config)
+            probes.start()
+
+        for monitor in self._monitors.values():
+            monitor.set_rng(self._rng)
+            monitor.set_config(self._config)
+            monitor.start()
+
+    def _start_drivers(self) -> None:
         for name, driver in self._drivers.items():
+            driver.set_rng(self._rng)
             driver.set_config(self._config)
-            driver.load_transaction_queue(self._driver_transaction_generators[name](self._config))
+            transactions = self._driver_transaction_generators[name](self._config)
+            driver.load_transaction_queue(self._scoreboard.lookahead(transactions))
             driver.start()
 
-        await self._scoreboard.start()
+    def coverage(self) -> dict[str, CoverageBins]:
+        components = list(self._drivers.items()) + list(self._monitors.items())
+        return {name: component.coverage for name, component in components if component.coverage is not None}
+
+    # With coverage_terminate the run ends once every bin has closed, or once the drivers have run dry.
+    def _coverage_closed(self) -> bool:
+        return all(group.closed for group in self.coverage().values()) or self._drivers_finished()
+
+    def _drivers_finished(self) -> bool:
+        return not any(driver.running for driver in self._drivers.values())
+
+    # Each driver finishes the transaction in flight and then stops pulling from its queue.
+    def _stop_drivers(self) -> None:
+        for driver in self._drivers.values():
+            driver.stop()
+
+    async def _run_until_coverage_closed(self) -> None:
+        while not self._coverage_closed():
+            await ClockCycles(self._clock, self._config["coverage_check_interval"])
+            self._scoreboard.check()
+
+        self._stop_drivers()
+        for driver in self._drivers.values():
+            await driver.wait_finished()
+        await self._scoreboard.drain()
+
+    # ------------------------------------------------------------------
+    #  Progress watchdog
+    # ------------------------------------------------------------------
+
+    def _progress(self) -> tuple:
+        interfaces = list(self._drivers.values()) + list(self._monitors.values())
+        return (self._scoreboard.progress, *(component.throughput.beats for component in interfaces))
+
+    def _outstanding(self) -> bool:
+        return not self._scoreboard.drained or any(driver.busy for driver in self._drivers.values())
+
+    # The progress watchdog of the last run, None if it never started. Done once the run has ended.
+    @property
+    def watchdog_task(self) -> Optional[Task]:
+        return self._watchdog_task
+
+    def _watchdog_reset(self) -> None:
+        self._watchdog_progress = self._progress()
+        self._watchdog_cycle = sim_cycles(self._config)
+
+    # Returns a failure message once the run has stalled, otherwise None.
+    def _watchdog_poll(self) -> Optional[str]:
+        progress = self._progress()
+        now = sim_cycles(self._config)
+        if progress != self._watchdog_progress or not self._outstanding():
+            self._watchdog_progress = progress
+            self._watchdog_cycle = now
+            return None
+        stalled = now - self._watchdog_cycle
+        if stalled < self._config["watchdog_cycles"]:
+            return None
+        return f"{self._name + ': ' if self._name else ''}Watchdog: no progress for {stalled:.0f} cycles at cycle {now:.0f}\n" + "\n".join(self._watchdog_dump())
+
+    def _watchdog_check(self) -> None:
+        message = self._watchdog_poll()
+        if message is not None:
+            raise AssertionError(message)
+
+    def _watchdog_dump(self) -> list[str]:
+        lines = [f"Scoreboard: {line}" for line in self._scoreboard.state()]
+        interfaces = list(self._drivers.items()) + list(self._monitors.items())
+        for name, component in interfaces:
+            busy = " busy" if isinstance(component, BaseDriver) and component.busy else ""
+            lines.append(f"{name}:{busy} {component.throughput.summary()}")
+            snapshot = component.port.snapshot() if isinstance(component.port, Bus) else {"port": component.port.value}
+            signals = " ".join(f"{alias}={_format_value(value)}" for alias, value in snapshot.items())
+            lines.append(f"{name}: {signals}")
+        return lines
+
+    async def _watchdog(self) -> str:
+        self._watchdog_reset()
+        while True:
+            await ClockCycles(self._clock, self._config["watchdog_check_interval"])
+            message = self._watchdog_poll()
+            if message is not None:
+                return message
+
+    async def _run_with_watchdog(self, body) -> None:
+        body_task = cocotb.start_soon(body)
+        if self._config["watchdog_cycles"] is None:
+            await body_task
+            return
+
+        self._watchdog_task = cocotb.start_soon(self._watchdog())
+        try:
+            await First(body_task, self._watchdog_task)
+            stalled = not body_task.done()
+        finally:
+            # Also when the body failed, so the watchdog cannot outlive the run it was watching.
+            for task in (body_task, self._watchdog_task):
+                if not task.done():
+                    task.cancel()
+        if stalled:
+            raise AssertionError(self._watchdog_task.result())
+        body_task.result()
+
+    def report(self) -> None:
+        self._log.info(f"Scoreboard: {self._scoreboard.summary()}")
+
+        interfaces = list(self._drivers.items()) + list(self._monitors.items())
+        for name, component in interfaces:
+            self._log.info(f"{name}: {component.throughput.summary()}")
+        for name, driver in self._drivers.items():
+            if driver.offered.count:
+                self._log.info(f"{name}: {driver.offered.summary()}")
+
+        coverage = self.coverage()
+        for name, group in coverage.items():
+            self._log.info(f"{name} coverage: {group.summary()}")
+        if self._config["coverage_output"] is not None:
+            save_coverage(self._config["coverage_output"], coverage.values())
+
+        for probes in self._probes:
+            probes.finish()
+            for line in probes.summary():
+                self._log.info(f"Probe {line}")
+        if self._config["probe_output"] is not None:
+            save_probes(self._config["probe_output"], self._probes)
+
+        self._scoreboard.check_bounds()
+
+        min_beats_per_cycle = self._config["min_beats_per_cycle"]
+        if min_beats_per_cycle is not None:
+            for name, component in interfaces:
+                beats_per_cycle = component.throughput.beats_per_cycle
+                if beats_per_cycle is not None and beats_per_cycle < min_beats_per_cycle:
+                    raise AssertionError(f"{name}: throughput {beats_per_cycle:.3f} beats/cycle below bound {min_beats_per_cycle}")
+
+
+# Runs several environments in one simulation on their shared clock, typically one per copy of
+# the DUT in an sv_multi_instance wrapper (see Module.instance), each with its own configuration.
+# Environments on the tick scheduler share a single dispatcher. Each reports under its own name,
+# and once all have finished the run fails if any of them did.
+async def run_environments(environments: dict[str, BaseEnvironment]) -> None:
+    assert environments
+    for name, environment in environments.items():
+        assert isinstance(environment, BaseEnvironment)
+        environment.set_name(name)
+
+    first = next(iter(environments.values()))
+    first._start_clock()
+    try:
+        scheduler = None
+        if all(environment._config["scheduler"] == "tick" for environment in environments.values()):
+            scheduler = TickScheduler(first._clock, first._config)
+        for environment in environments.values():
+            environment._start_components(scheduler)
+
+        await Combine(*(cocotb.start_soon(environment._reset()) for environment in environments.values()))
+
+        tasks = {name: cocotb.start_soon(environment._run_isolated()) for name, environment in environments.items()}
+        await Combine(*tasks.values())
+    finally:
+        for environment in environments.values():
+            environment.stop()
+
+    failures = {name: task.result() for name, task in tasks.items() if task.result() is not None}
+    log.info(f"{len(environments) - len(failures)}/{len(environments)} environments passed")
+    if failures:
+        raise AssertionError("Failed environments:\n" + "\n".join(f"{name}: {error}" for name, error in failures.items()))
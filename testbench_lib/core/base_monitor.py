@@ -1,4 +1,5 @@
-from typing import Callable, Any, Union
+import random
+from typing import Callable, Any, Optional, Union
 from abc import abstractmethod
 from dataclasses import dataclass, field
 
@@ -7,6 +8,9 @@ from cocotb.task import Task
 from cocotb.clock import Clock
 from cocotb.handle import LogicObject, LogicArrayObject
 
+from base_statistics import ThroughputCounter
+from base_coverage import CoverageBins
+
 @dataclass
 class BaseMonitor:
     clock: Clock
@@ -15,15 +19,50 @@ class BaseMonitor:
 
     _task: Task = field(default=None, init=False, repr=False)
     _config: dict[str, Any] = field(default=None, init=False, repr=False)
+    _throughput: ThroughputCounter = field(default_factory=ThroughputCounter, init=False, repr=False)
+    _coverage: Optional[CoverageBins] = field(default=None, init=False, repr=False)
+    _scheduler: Any = field(default=None, init=False, repr=False)
+    _rng: Any = field(default=random, init=False, repr=False)
+
+    @property
+    def throughput(self) -> ThroughputCounter:
+        return self._throughput
+
+    @property
+    def coverage(self) -> Optional[CoverageBins]:
+        return self._coverage
+
+    @property
+    def supports_tick(self) -> bool:
+        return type(self).tick_sample is not BaseMonitor.tick_sample
+
+    def set_rng(self, rng: random.Random) -> None:
+        self._rng = rng
 
     @abstractmethod
     async def _receive(self) -> Any:
         pass
 
+    # Per-cycle hooks for the tick scheduler: write phase after the edge, then ReadOnly phase.
+    def tick_drive(self) -> None:
+        raise NotImplementedError
+
+    def tick_sample(self) -> None:
+        raise NotImplementedError
+
     def set_config(self, config: dict[str, Any]):
         assert isinstance(config, dict)
         self._config = config
+        if self._coverage is not None:
+            self._coverage.goal = config["coverage_goal"]
 
     def start(self) -> None:
-        if self._task is None:
+        if self._scheduler is not None:
+            self._scheduler.arm(self)
+        elif self._task is None:
             self._task = cocotb.start_soon(self._receive())
+
+    def cancel(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
@@ -0,0 +1,61 @@
+import struct
+from typing import Any, Iterator, Optional
+
+from base_types import Bytes
+
+# ------------------------------------------------------------------
+#  PCAP capture sources, see common_sim_lib/pcap/pcap_pkg.sv
+# ------------------------------------------------------------------
+
+PCAP_MAGIC_NUMBER = 0xA1B2C3D4
+PCAP_MAGIC_NUMBER_NS = 0xA1B23C4D
+PCAP_GLOBAL_HEADER_WIDTH = 24
+PCAP_PACKET_HEADER_WIDTH = 16
+
+class PcapPacket(Bytes):
+    # Capture timestamp in seconds, and the cycle the packet is due on the bus relative to
+    # the first packet of the replay.
+    timestamp: Optional[float] = None
+    arrival_cycle: Optional[int] = None
+
+
+def read_pcap(path: str) -> Iterator[PcapPacket]:
+    with open(path, "rb") as f:
+        header = f.read(PCAP_GLOBAL_HEADER_WIDTH)
+        if len(header) != PCAP_GLOBAL_HEADER_WIDTH:
+            raise ValueError(f"Failed to read PCAP global header from {path}")
+
+        # .pcap files may be either little or big endian, with micro or nanosecond timestamps.
+        for endian in ("<", ">"):
+            magic = struct.unpack_from(f"{endian}I", header)[0]
+            if magic in (PCAP_MAGIC_NUMBER, PCAP_MAGIC_NUMBER_NS):
+                break
+        else:
+            raise ValueError(f"Invalid PCAP magic number in {path}")
+        resolution = 1e-9 if magic == PCAP_MAGIC_NUMBER_NS else 1e-6
+        packet_header = struct.Struct(f"{endian}IIII")
+
+        while header := f.read(PCAP_PACKET_HEADER_WIDTH):
+            if len(header) != PCAP_PACKET_HEADER_WIDTH:
+                raise ValueError(f"Truncated PCAP packet header in {path}")
+            ts_sec, ts_frac, incl_len, _ = packet_header.unpack(header)
+            data = f.read(incl_len)
+            if len(data) != incl_len:
+                raise ValueError(f"Truncated PCAP packet in {path}")
+
+            packet = PcapPacket(data)
+            packet.timestamp = ts_sec + ts_frac * resolution
+            yield packet
+
+
+# Replay a capture with its original inter-arrival timing. A bus of bus_width bits running at
+# pcap_line_rate_bps / bus_width cycles per second carries the capture at line rate, so capture
+# time maps onto cycles at that rate, compressed by pcap_speedup.
+def pcap_replay(path: str, config: dict[str, Any], bus_width: int) -> Iterator[PcapPacket]:
+    cycles_per_second = config["pcap_line_rate_bps"] / bus_width / config["pcap_speedup"]
+    first_timestamp = None
+    for packet in read_pcap(path):
+        if first_timestamp is None:
+            first_timestamp = packet.timestamp
+        packet.arrival_cycle = round((packet.timestamp - first_timestamp) * cycles_per_second)
+        yield packet
@@ -0,0 +1,232 @@
+import re
+import json
+from array import array
+from typing import Any, Iterable, Optional, Union
+
+import cocotb
+from cocotb.task import Task
+from cocotb.triggers import ClockCycles, ReadOnly, ValueChange
+from cocotb.handle import HierarchyObject, LogicObject, LogicArrayObject
+
+from base_statistics import sim_cycle
+
+# ------------------------------------------------------------------
+#  Sampled internal probes
+# ------------------------------------------------------------------
+
+_PATH_PART = re.compile(r"(\w+)((?:\[\d+\])*)")
+
+# Resolve a dotted hierarchy path such as "g_buffer_lanes[3].fifo_i.empty_o" below root.
+def resolve_path(root: HierarchyObject, path: str) -> Union[LogicObject, LogicArrayObject]:
+    handle = root
+    for part in path.split("."):
+        match = _PATH_PART.fullmatch(part)
+        if match is None:
+            raise ValueError(f"Invalid hierarchy path component '{part}' in '{path}'")
+        handle = handle[match.group(1)]
+        for idx in re.findall(r"\d+", match.group(2)):
+            handle = handle[int(idx)]
+    return handle
+
+
+# Time series of a narrow status signal (flag, counter, occupancy) held in a fixed size ring
+# buffer, plus a histogram of the cycles spent at each value. Memory is fixed once set_depth
+# has been called, however long the run.
+class Probe:
+
+    def __init__(self, name: str, handle: Union[LogicObject, LogicArrayObject], on_change: bool = False):
+        self.name: str = name
+        self.handle: Union[LogicObject, LogicArrayObject] = handle
+        self.on_change: bool = on_change
+        self.set_depth(1024, 64)
+
+    def set_depth(self, depth: int, num_bins: int) -> None:
+        assert depth > 0 and num_bins > 0
+        self._cycles: array = array("Q", bytes(8 * depth))
+        self._values: array = array("Q", bytes(8 * depth))
+        self._head: int = 0
+        self._count: int = 0
+        self._histogram: array = array("Q", bytes(8 * num_bins))
+        self._overflow: int = 0
+        self._total_cycles: int = 0
+        self._weighted: int = 0
+        self._last_cycle: Optional[int] = None
+        self._last_value: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def read(self) -> Optional[int]:
+        value = self.handle.value
+        try:
+            return value.to_unsigned() if hasattr(value, "to_unsigned") else int(value)
+        except ValueError: # X/Z, e.g. before reset
+            return None
+
+    # Credit the previously recorded value with the cycles it was held for.
+    def _account(self, cycle: int) -> None:
+        if self._last_value is None:
+            return
+        held = cycle - self._last_cycle
+        if self._last_value < len(self._histogram):
+            self._histogram[self._last_value] += held
+        else:
+            self._overflow += held
+        self._total_cycles += held
+        self._weighted += self._last_value * held
+
+    def record(self, cycle: int, value: Optional[int]) -> None:
+        self._account(cycle)
+        self._last_cycle = cycle
+        self._last_value = value
+        if value is None:
+            return
+
+        self._cycles[self._head] = cycle
+        self._values[self._head] = value
+        self._head = (self._head + 1) % len(self._values)
+        self._count += 1
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def finish(self, cycle: int) -> None:
+        self._account(cycle)
+        self._last_cycle = cycle
+
+    # The most recent samples, oldest first.
+    def samples(self) -> list[tuple[int, int]]:
+        depth = len(self._values)
+        num = min(self._count, depth)
+        start = (self._head - num) % depth
+        return [(self._cycles[(start + i) % depth], self._values[(start + i) % depth]) for i in range(num)]
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._weighted / self._total_cycles if self._total_cycles else None
+
+    # Fraction of the observed cycles spent at value, e.g. duty(0) of a tready is its stall duty cycle.
+    def duty(self, value: int) -> Optional[float]:
+        if not self._total_cycles or value >= len(self._histogram):
+            return None
+        return self._histogram[value] / self._total_cycles
+
+    def summary(self) -> str:
+        if not self._total_cycles:
+            return "no samples"
+        text = f"samples={self._count} cycles={self._total_cycles} mean={self.mean:.2f} max={self.max}"
+        if self.max is not None and self.max <= 1:
+            text += f" low={self.duty(0):.1%} high={self.duty(1):.1%}"
+        return text
+
+    def to_dict(self) -> dict[str, Any]:
+        histogram = list(self._histogram)
+        while histogram and not histogram[-1]:
+            histogram.pop()
+        return {
+            "path": self.handle._path,
+            "on_change": self.on_change,
+            "cycles": self._total_cycles,
+            "mean": self.mean,
+            "max": self.max,
+            "histogram": histogram,
+            "overflow": self._overflow,
+            "samples": self.samples(),
+        }
+
+
+# A group of probes below one root. Periodic probes are read together every probe_interval
+# cycles from a single task (or tick), so the per-cycle cost is set by the interval rather
+# than the number of probes. on_change probes wake only when their signal toggles.
+class ProbeSet:
+
+    def __init__(self, clock: LogicObject, root: HierarchyObject):
+        self._clock: LogicObject = clock
+        self._root: HierarchyObject = root
+        self._config: dict[str, Any] = None
+        self._probes: dict[str, Probe] = {}
+        self._scheduler: Any = None
+        self._started: bool = False
+        self._tasks: list[Task] = []
+
+    def add(self, name: str, path: str, on_change: bool = False) -> Probe:
+        assert name not in self._probes, f"Duplicate probe name '{name}'"
+        probe = Probe(name, resolve_path(self._root, path), on_change)
+        self._probes[name] = probe
+        return probe
+
+    @property
+    def probes(self) -> dict[str, Probe]:
+        return self._probes
+
+    @property
+    def supports_tick(self) -> bool:
+        return True
+
+    def set_config(self, config: dict[str, Any]) -> None:
+        assert isinstance(config, dict)
+        self._config = config
+        for probe in self._probes.values():
+            probe.set_depth(config["probe_depth"], config["probe_histogram_bins"])
+
+    def _cycle(self) -> int:
+        return sim_cycle(self._config)
+
+    def _sample(self) -> None:
+        cycle = self._cycle()
+        for probe in self._probes.values():
+            if not probe.on_change:
+                probe.record(cycle, probe.read())
+
+    async def _sample_periodic(self) -> None:
+        interval = self._config["probe_interval"]
+        while True:
+            await ClockCycles(self._clock, interval)
+            await ReadOnly()
+            self._sample()
+
+    async def _sample_on_change(self, probe: Probe) -> None:
+        probe.record(self._cycle(), probe.read())
+        while True:
+            await ValueChange(probe.handle)
+            probe.record(self._cycle(), probe.read())
+
+    def tick_drive(self) -> None:
+        pass
+
+    def tick_sample(self) -> None:
+        self._sample()
+        if self._config["probe_interval"] > 1:
+            self._scheduler.sleep(self, self._config["probe_interval"])
+
+    def start(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        for probe in self._probes.values():
+            if probe.on_change:
+                self._tasks.append(cocotb.start_soon(self._sample_on_change(probe)))
+        if not any(not probe.on_change for probe in self._probes.values()):
+            return
+        if self._scheduler is not None:
+            self._scheduler.arm(self)
+        else:
+            self._tasks.append(cocotb.start_soon(self._sample_periodic()))
+
+    def cancel(self) -> None:
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+        self._tasks = []
+        self._started = False
+
+    def finish(self) -> None:
+        cycle = self._cycle()
+        for probe in self._probes.values():
+            probe.finish(cycle)
+
+    def summary(self) -> list[str]:
+        return [f"{name}: {probe.summary()}" for name, probe in self._probes.items()]
+
+
+def save_probes(path: str, probe_sets: Iterable[ProbeSet]) -> None:
+    probes = {name: probe.to_dict() for probe_set in probe_sets for name, probe in probe_set.probes.items()}
+    with open(path, "w") as f:
+        json.dump(probes, f, indent=2)
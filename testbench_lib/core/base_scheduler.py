@@ -0,0 +1,213 @@
+import heapq
+from typing import Any, Callable, Optional, override
+
+import cocotb
+from cocotb.task import Task
+from cocotb.triggers import RisingEdge, ReadOnly, ClockCycles, Event, First
+from cocotb.handle import LogicObject
+
+from base_statistics import sim_cycle, set_time_source
+
+# ------------------------------------------------------------------
+#  Central per-edge dispatcher
+# ------------------------------------------------------------------
+
+# Dispatch list shared by the schedulers below. Components with nothing to do call sleep() or
+# park() to drop off the list and are re-armed by the scheduler (sleep) or by themselves (arm),
+# so the per-cycle cost scales with the number of active components.
+class _TickDispatcher:
+
+    def __init__(self, config: dict[str, Any]):
+        self._config: dict[str, Any] = config
+        self._cycle: int = 0
+        self._components: list[Any] = []
+        self._index: dict[int, int] = {}
+        self._active: list[Any] = []
+        self._active_ids: set[int] = set()
+        self._sleepers: list[tuple[int, int, Any]] = []
+
+    @property
+    def cycle(self) -> int:
+        return self._cycle
+
+    def register(self, component: Any) -> None:
+        self._index[id(component)] = len(self._components)
+        self._components.append(component)
+        component._scheduler = self
+
+    def arm(self, component: Any) -> None:
+        if id(component) in self._active_ids:
+            return
+        self._active_ids.add(id(component))
+        self._active.append(component)
+        self._active.sort(key=lambda c: self._index[id(c)])
+
+    def park(self, component: Any) -> None:
+        if id(component) in self._active_ids:
+            self._active_ids.discard(id(component))
+            self._active.remove(component)
+
+    def sleep(self, component: Any, cycles: int) -> None:
+        assert cycles > 0
+        self.park(component)
+        heapq.heappush(self._sleepers, (self._cycle + cycles, self._index[id(component)], component))
+
+    def _wake_sleepers(self) -> None:
+        while self._sleepers and self._sleepers[0][0] <= self._cycle:
+            self.arm(heapq.heappop(self._sleepers)[2])
+
+    # Parks component until signal reads non-zero, if the scheduler can watch signals itself.
+    # Returns False when it cannot, leaving the component to arrange its own wakeup.
+    def park_until_active(self, component: Any, signal: Any) -> bool:
+        return False
+
+
+# Awaits each clock edge once and calls the synchronous per-cycle hooks of the registered
+# components, in registration order: tick_drive() after the edge, tick_sample() in the
+# ReadOnly phase. With nothing active the dispatcher skips straight to the next wakeup.
+class TickScheduler(_TickDispatcher):
+
+    def __init__(self, clock: LogicObject, config: dict[str, Any]):
+        super().__init__(config)
+        self._clock: LogicObject = clock
+        self._armed: Event = Event()
+        self._task: Task = None
+
+    @override
+    def arm(self, component: Any) -> None:
+        super().arm(component)
+        self._armed.set()
+
+    async def _run(self) -> None:
+        while True:
+            if self._active:
+                await RisingEdge(self._clock)
+            elif self._sleepers:
+                self._armed.clear()
+                cycles = self._sleepers[0][0] - self._cycle
+                timer = ClockCycles(self._clock, cycles)
+                if await First(timer, self._armed.wait()) is not timer:
+                    continue
+            else:
+                self._armed.clear()
+                await self._armed.wait()
+                continue
+
+            self._cycle = sim_cycle(self._config)
+            self._wake_sleepers()
+
+            components = list(self._active)
+            for component in components:
+                component.tick_drive()
+
+            await ReadOnly()
+            for component in components:
+                if id(component) in self._active_ids:
+                    component.tick_sample()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._cycle = sim_cycle(self._config)
+            self._task = cocotb.start_soon(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+
+# Same dispatch, stepping an in-process model (testbench_lib.verilator.VerilatorModel) instead of
+# awaiting cocotb triggers: rising edge, tick_drive(), settle, tick_sample(), falling edge. While
+# nothing is active the model free-runs up to the next wakeup in a single call, stopping early in
+# the cycle a watched signal (see park_until_active) goes high. Simulation time is taken from the
+# cycle count, see set_time_source.
+class DirectScheduler(_TickDispatcher):
+
+    def __init__(self, model: Any, config: dict[str, Any]):
+        super().__init__(config)
+        self._model: Any = model
+        self._model.set_config(config)
+        self._watchers: dict[int, tuple[Any, Any]] = {}
+
+    def _time(self) -> float:
+        return self._cycle * self._config["clock_period"]
+
+    @override
+    def park_until_active(self, component: Any, signal: Any) -> bool:
+        assert len(signal) <= 64, "Only ports up to 64 bits wide can be watched"
+        self.park(component)
+        self._watchers[id(component)] = (component, signal)
+        return True
+
+    # Arms the watchers whose signal has gone high and returns them.
+    def _wake_watchers(self) -> list[Any]:
+        woken = [component for component, signal in self._watchers.values() if signal.value]
+        for component in woken:
+            del self._watchers[id(component)]
+            self.arm(component)
+        return woken
+
+    def _step(self) -> None:
+        self._cycle += 1
+        self._wake_sleepers()
+        self._model.rising_edge()
+        self._dispatch()
+
+    # The rest of a cycle once the rising edge has been evaluated.
+    def _dispatch(self) -> None:
+        self._wake_watchers()
+        components = list(self._active)
+        for component in components:
+            component.tick_drive()
+        self._model.eval()
+
+        # A watched signal raised combinationally by this cycle's writes, as a ValueChange
+        # would catch under cocotb. The woken components drive before anything samples.
+        if woken := self._wake_watchers():
+            for component in woken:
+                component.tick_drive()
+            self._model.eval()
+            components = list(self._active)
+
+        for component in components:
+            if id(component) in self._active_ids:
+                component.tick_sample()
+        self._model.falling_edge()
+
+    def run(self, cycles: int) -> None:
+        end = self._cycle + cycles
+        while self._cycle < end:
+            if not self._active:
+                wake = self._sleepers[0][0] if self._sleepers else end + 1
+                idle = min(wake - 1, end) - self._cycle
+                if idle > 0:
+                    if not self._watchers:
+                        self._model.run(idle)
+                        self._cycle += idle
+                        continue
+                    completed = self._model.run_until_active(idle, [signal for _, signal in self._watchers.values()])
+                    self._cycle += completed
+                    if completed < idle:
+                        # Stopped just after the edge of the cycle a watched signal went high.
+                        self._cycle += 1
+                        self._wake_sleepers()
+                        self._dispatch()
+                    continue
+            self._step()
+
+    # Run in chunks of interval cycles until condition() holds.
+    # check, if given, is called every interval cycles and may raise to abort the run.
+    def run_until(self, condition: Callable[[], bool], interval: int, timeout_cycles: int,
+                  check: Optional[Callable[[], None]] = None) -> None:
+        while not condition():
+            if self._cycle >= timeout_cycles:
+                raise TimeoutError(f"Direct run did not finish within {timeout_cycles} cycles")
+            self.run(interval)
+            if check is not None:
+                check()
+
+    def start(self) -> None:
+        set_time_source(self._time)
+
+    def stop(self) -> None:
+        set_time_source(None)
@@ -1,43 +1,323 @@
-from typing import Callable, Any
+import os
+import multiprocessing
+from typing import Callable, Any, Iterable, Iterator, Optional
 from collections import deque
+from itertools import islice
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+import cocotb
+from cocotb.triggers import Event, Timer
+
+from base_statistics import LatencyHistogram
+from base_types import PacketBatch, Fragment
+
+def _truncate(transaction: Any, limit: int = 160) -> str:
+    text = str(transaction)
+    return text if len(text) <= limit else text[:limit] + f"... ({len(text)} chars)"
+
+# ------------------------------------------------------------------
+#  Off-loop reference model workers
+# ------------------------------------------------------------------
+
+_worker_callback: Optional[Callable[[Any], Any]] = None
+
+def _init_worker(callback: Callable[[Any], Any]) -> None:
+    global _worker_callback
+    _worker_callback = callback
+
+def _process_batch(batch: list[Any]) -> list[Any]:
+    return [_worker_callback(transaction) for transaction in batch]
+
+def _process_batch_with(callback: Callable[[Any], Any], batch: list[Any]) -> list[Any]:
+    return [callback(transaction) for transaction in batch]
 
-from cocotb.triggers import Event
 
 class BaseScoreboard:
 
     def __init__(self, process_transaction_callback: Callable[[Any], Any]):
         assert callable(process_transaction_callback)
         self._process_transaction_callback: Callable[[Any], Any] = process_transaction_callback
+        self.name: str = "Scoreboard"
         self._config: dict[str, Any] = {}
         self._expect_queue: deque = deque()
+        self._expect_sources: deque = deque()
         self._receive_queue: deque = deque()
+        self._stream_offset: int = 0
         self._received_matches: int = 0
+        self._num_expected: int = 0
+        self._num_received: int = 0
+        self._last_expected: deque = deque(maxlen=4)
+        self._last_received: deque = deque(maxlen=4)
+        self._latency: LatencyHistogram = LatencyHistogram()
         self._done: Event = Event()
+        self._drained: Event = Event()
+        self._error: Optional[Exception] = None
+
+        # Asynchronous model state. Each pending entry is a [future, index, source] triple in expect
+        # order; the future is None until the batch holding the transaction has been submitted.
+        self._executor: Optional[Executor] = None
+        self._pending: deque[list] = deque()
+        self._prefetched: dict[int, list] = {}
+        self._batch: list[Any] = []
+        self._batch_entries: list[list] = []
+        self._poll_task = None
+
+    @property
+    def latency(self) -> LatencyHistogram:
+        return self._latency
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def failed(self) -> bool:
+        return self._error is not None
+
+    @property
+    def drained(self) -> bool:
+        return not self._pending and not self._expect_queue and not self._receive_queue
+
+    # Only ever increases, so the environment watchdog can tell whether anything happened.
+    @property
+    def progress(self) -> int:
+        return self._num_expected + self._num_received + self._received_matches
+
+    # The driver stamps start_time when the first beat is accepted, which is after the expect
+    # callback, so it is read from the source transaction only once the output has matched.
+    def _record_latency(self, source: Any, received: Any) -> None:
+        start_time = getattr(source, "start_time", None)
+        end_time = getattr(received, "start_time", None)
+        if start_time is None or end_time is None:
+            return
+        self._latency.record((end_time - start_time) / self._config["clock_period"])
+
+    # Raised by check() from the waiting test rather than in the monitor that delivered the
+    # transaction, so a failed run does not take the simulator down with it.
+    def _fail(self, message: str) -> None:
+        self._error = ValueError(f"{self.name} mismatch: {message}")
+        self._done.set()
+        self._drained.set()
+
+    # Compares a fragment against the expected packet at the stream cursor. Returns False on a
+    # mismatch, True once the fragment has been consumed.
+    def _compare_fragment(self, expected: Any, fragment: Fragment) -> bool:
+        offset = self._stream_offset
+        window = bytes(expected[offset : offset + len(fragment)])
+        if window != fragment.data:
+            index = next((i for i, (a, b) in enumerate(zip(window, fragment.data)) if a != b), len(window))
+            if offset + index >= len(expected):
+                self._fail(f"received byte {offset + index} at cycle {fragment.cycle:.0f} beyond the end of the expected {len(expected)} byte packet")
+            else:
+                self._fail(
+                    f"first difference at byte {offset + index} at cycle {fragment.cycle:.0f}: "
+                    f"expected {window.hex(' ').upper()}, received {fragment.data.hex(' ').upper()}"
+                )
+            return False
+
+        self._stream_offset += len(fragment)
+        if fragment.last and self._stream_offset != len(expected):
+            self._fail(f"packet ended at byte {self._stream_offset} at cycle {fragment.cycle:.0f}, expected {len(expected)} bytes")
+            return False
+        return True
 
     def _resolve_queues(self) -> None:
+        if self._error is not None:
+            return
         while self._expect_queue and self._receive_queue:
-            if self._expect_queue[0] == self._receive_queue[0]:
-                self._expect_queue.popleft()
+            received = self._receive_queue[0]
+            if isinstance(received, Fragment):
+                if not self._compare_fragment(self._expect_queue[0], received):
+                    return
                 self._receive_queue.popleft()
-                self._received_matches += 1
+                if not received.last:
+                    continue
+                self._stream_offset = 0
+            elif self._expect_queue[0] != received:
+                self._fail(f"expected {self._expect_queue[0]}, received {received}")
+                return
             else:
-                raise ValueError(f"Scoreboard mismatch: expected {self._expect_queue[0]}, received {self._receive_queue[0]}")
-            
+                self._receive_queue.popleft()
+
+            self._expect_queue.popleft()
+            self._record_latency(self._expect_sources.popleft(), received)
+            self._received_matches += 1
+
+        if not self._pending and not self._expect_queue and not self._receive_queue:
+            self._drained.set()
+
         if self._received_matches == self._config["scoreboard_expected_matches"]:
             self._done.set()
 
+    def _create_executor(self) -> Optional[Executor]:
+        workers = self._config["scoreboard_model_workers"]
+        if not workers:
+            return None
+        if self._config["scoreboard_model_executor"] == "thread":
+            return ThreadPoolExecutor(max_workers=workers)
+
+        # The simulator binary embeds Python, so spawned workers must be pointed back at a real interpreter.
+        context = multiprocessing.get_context("spawn")
+        if "PYGPI_PYTHON_BIN" in os.environ:
+            context.set_executable(os.environ["PYGPI_PYTHON_BIN"])
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._process_transaction_callback,),
+        )
+
     def set_config(self, config: dict[str, Any]):
         assert isinstance(config, dict)
         self._config = config
+        self._latency = LatencyHistogram(config["scoreboard_latency_histogram_bins"])
+        self._last_expected = deque(maxlen=config["watchdog_history"])
+        self._last_received = deque(maxlen=config["watchdog_history"])
+        self._executor = self._create_executor()
+
+    def _submit(self, batch: list[Any]) -> Future:
+        if isinstance(self._executor, ProcessPoolExecutor):
+            return self._executor.submit(_process_batch, batch)
+        return self._executor.submit(_process_batch_with, self._process_transaction_callback, batch)
+
+    def _flush_batch(self) -> None:
+        if not self._batch:
+            return
+        future = self._submit(self._batch)
+        for entry in self._batch_entries:
+            entry[0] = future
+        self._batch = []
+        self._batch_entries = []
+
+    # A model may return a PacketBatch when one input produces several outputs.
+    def _push_expected(self, result: Any, source: Any) -> None:
+        if isinstance(result, PacketBatch):
+            self._expect_queue.extend(result)
+            self._expect_sources.extend([source] * len(result))
+        else:
+            self._expect_queue.append(result)
+            self._expect_sources.append(source)
+
+    # Move finished model results onto the expect queue, preserving expect order.
+    def _collect(self) -> None:
+        while self._pending and self._pending[0][0] is not None and self._pending[0][0].done():
+            future, idx, source = self._pending.popleft()
+            self._push_expected(future.result()[idx], source)
+
+    async def _poll(self) -> None:
+        interval = self._config["clock_period"] * self._config["scoreboard_model_poll_cycles"]
+        while self._pending:
+            await Timer(interval, self._config["timescale"])
+            self._flush_batch()
+            self._collect()
+            self._resolve_queues()
+        self._poll_task = None
+
+    # Submit upcoming transactions to the model before the driver reaches them.
+    def prefetch(self, transactions: list[Any]) -> None:
+        if self._executor is None or not transactions:
+            return
+        future = self._submit(transactions)
+        for idx, transaction in enumerate(transactions):
+            self._prefetched[id(transaction)] = [future, idx, None]
+
+    # Wrap a driver's transaction source so the model runs scoreboard_model_lookahead transactions ahead.
+    # With coverage_directed there is no lookahead: reading ahead would draw stimulus from the
+    # generator before the coverage steering it had been sampled.
+    def lookahead(self, transactions: Iterable[Any]) -> Iterator[Any]:
+        if self._executor is None or self._config["coverage_directed"]:
+            yield from transactions
+            return
+
+        batch_size = self._config["scoreboard_model_batch_size"]
+        depth = self._config["scoreboard_model_lookahead"]
+        source = iter(transactions)
+        window: deque = deque()
+        exhausted = False
+        while True:
+            while not exhausted and len(window) < depth:
+                batch = list(islice(source, batch_size))
+                self.prefetch(batch)
+                window.extend(batch)
+                exhausted = len(batch) < batch_size
+            if not window:
+                return
+            yield window.popleft()
 
     def expect_transaction(self, transaction) -> None:
         assert self._process_transaction_callback is not None
-        self._expect_queue.append(self._process_transaction_callback(transaction))
+        self._num_expected += 1
+        self._last_expected.append(transaction)
+
+        if self._executor is None:
+            self._push_expected(self._process_transaction_callback(transaction), transaction)
+            self._resolve_queues()
+            return
+
+        entry = self._prefetched.pop(id(transaction), None)
+        if entry is None:
+            entry = [None, len(self._batch), None]
+            self._batch.append(transaction)
+            self._batch_entries.append(entry)
+            if len(self._batch) >= self._config["scoreboard_model_batch_size"]:
+                self._flush_batch()
+        entry[2] = transaction
+        self._pending.append(entry)
+
+        self._collect()
         self._resolve_queues()
+        if self._poll_task is None:
+            self._poll_task = cocotb.start_soon(self._poll())
 
+    # Takes a single transaction, a Fragment of one (monitor_streaming) or a PacketBatch.
     def receive_transaction(self, transaction) -> None:
-        self._receive_queue.append(transaction)
+        transactions = transaction if isinstance(transaction, PacketBatch) else (transaction,)
+        for transaction in transactions:
+            # A streamed packet counts once, on its final fragment.
+            if not isinstance(transaction, Fragment) or transaction.last:
+                self._num_received += 1
+            self._last_received.append(transaction)
+            self._receive_queue.append(transaction)
+        if self._executor is not None:
+            self._collect()
         self._resolve_queues()
 
+    def close(self) -> None:
+        if self._poll_task is not None and not self._poll_task.done():
+            self._poll_task.cancel()
+        self._poll_task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def check_bounds(self) -> None:
+        max_latency = self._config["scoreboard_max_latency_cycles"]
+        if max_latency is not None and self._latency.max is not None and self._latency.max > max_latency:
+            raise AssertionError(f"Latency bound exceeded: {self._latency.max:.0f} > {max_latency} cycles")
+
+    def summary(self) -> str:
+        return f"matches={self._received_matches} latency[cycles]: {self._latency.summary()}"
+
+    def state(self) -> list[str]:
+        return [
+            f"expected={self._num_expected} received={self._num_received} matches={self._received_matches}",
+            f"outstanding: expect_queue={len(self._expect_queue)} receive_queue={len(self._receive_queue)} model_pending={len(self._pending)}",
+            *(f"last expected: {_truncate(transaction)}" for transaction in self._last_expected),
+            *(f"last received: {_truncate(transaction)}" for transaction in self._last_received),
+        ]
+
+    def check(self) -> None:
+        if self._error is not None:
+            raise self._error
+
     async def start(self):
         await self._done.wait()
+        self.check()
+
+    # Wait until every expected transaction has been matched.
+    async def drain(self):
+        self.check()
+        if self._pending or self._expect_queue or self._receive_queue:
+            self._drained.clear()
+            await self._drained.wait()
+        self.check()
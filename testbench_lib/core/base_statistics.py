@@ -0,0 +1,160 @@
+import math
+from array import array
+from typing import Any, Callable, Optional
+
+from cocotb.utils import get_sim_time
+
+# ------------------------------------------------------------------
+#  Streaming performance statistics
+# ------------------------------------------------------------------
+
+# Simulation time in config["timescale"] units. Backends that run without a cocotb simulator
+# (see DirectScheduler) install their own time source.
+_time_source: Optional[Callable[[], float]] = None
+
+def set_time_source(source: Optional[Callable[[], float]]) -> None:
+    global _time_source
+    _time_source = source
+
+def sim_time(config: dict[str, Any]) -> float:
+    if _time_source is not None:
+        return _time_source()
+    return get_sim_time(config["timescale"])
+
+def sim_cycles(config: dict[str, Any]) -> float:
+    return sim_time(config) / config["clock_period"]
+
+# Integer index of the current clock cycle. The clock starts low, so rising edges fall half a
+# period into each cycle; flooring maps every edge to a distinct cycle where round() would send
+# consecutive .5 ties to the same even number.
+def sim_cycle(config: dict[str, Any]) -> int:
+    return math.floor(sim_cycles(config))
+
+
+# One bucket per cycle up to num_bins, everything beyond lands in the overflow bucket.
+class LatencyHistogram:
+
+    def __init__(self, num_bins: int = 256):
+        assert num_bins > 0
+        self._bins: array = array("Q", bytes(8 * num_bins))
+        self._overflow: int = 0
+        self.count: int = 0
+        self.total: float = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, cycles: float) -> None:
+        idx = int(cycles)
+        if 0 <= idx < len(self._bins):
+            self._bins[idx] += 1
+        else:
+            self._overflow += 1
+
+        self.count += 1
+        self.total += cycles
+        if self.min is None or cycles < self.min:
+            self.min = cycles
+        if self.max is None or cycles > self.max:
+            self.max = cycles
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, pct: float) -> Optional[int]:
+        if not self.count:
+            return None
+        target = pct / 100 * self.count
+        seen = 0
+        for idx, hits in enumerate(self._bins):
+            seen += hits
+            if seen >= target:
+                return idx
+        return len(self._bins)
+
+    def summary(self) -> str:
+        if not self.count:
+            return "no samples"
+        return (
+            f"n={self.count} min={self.min:.0f} mean={self.mean:.2f} p50={self.percentile(50)} "
+            f"p99={self.percentile(99)} max={self.max:.0f} overflow={self._overflow}"
+        )
+
+
+# Counts accepted beats and bytes over the window between the first and last beat.
+class ThroughputCounter:
+
+    def __init__(self):
+        self.beats: int = 0
+        self.bytes: int = 0
+        self.first_cycle: Optional[float] = None
+        self.last_cycle: Optional[float] = None
+
+    def record_beat(self, cycle: float, num_bytes: int) -> None:
+        if self.first_cycle is None:
+            self.first_cycle = cycle
+        self.last_cycle = cycle
+        self.beats += 1
+        self.bytes += num_bytes
+
+    @property
+    def cycles(self) -> float:
+        if self.first_cycle is None:
+            return 0
+        return self.last_cycle - self.first_cycle + 1
+
+    @property
+    def beats_per_cycle(self) -> Optional[float]:
+        return self.beats / self.cycles if self.beats else None
+
+    @property
+    def bytes_per_cycle(self) -> Optional[float]:
+        return self.bytes / self.cycles if self.beats else None
+
+    def summary(self) -> str:
+        if not self.beats:
+            return "no beats"
+        return (
+            f"beats={self.beats} bytes={self.bytes} cycles={self.cycles:.0f} "
+            f"beats/cycle={self.beats_per_cycle:.3f} bytes/cycle={self.bytes_per_cycle:.3f}"
+        )
+
+
+# Load offered by a timestamp-paced source against what the bus accepted. lag is how many
+# cycles behind its arrival_cycle a transaction started, i.e. time spent queued behind backpressure.
+class OfferedLoad:
+
+    def __init__(self):
+        self.count: int = 0
+        self.bytes: int = 0
+        self.first_cycle: Optional[int] = None
+        self.last_cycle: Optional[int] = None
+        self.total_lag: int = 0
+        self.max_lag: int = 0
+
+    def record(self, arrival_cycle: int, num_bytes: int, lag: int) -> None:
+        if self.first_cycle is None:
+            self.first_cycle = arrival_cycle
+        self.last_cycle = arrival_cycle
+        self.count += 1
+        self.bytes += num_bytes
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+    @property
+    def bytes_per_cycle(self) -> Optional[float]:
+        if not self.count:
+            return None
+        return self.bytes / (self.last_cycle - self.first_cycle + 1)
+
+    @property
+    def mean_lag(self) -> Optional[float]:
+        return self.total_lag / self.count if self.count else None
+
+    def summary(self) -> str:
+        if not self.count:
+            return "nothing offered"
+        return (
+            f"offered={self.count} bytes={self.bytes} offered bytes/cycle={self.bytes_per_cycle:.3f} "
+            f"lag[cycles]: mean={self.mean_lag:.2f} max={self.max_lag}"
+        )
@@ -1,7 +1,13 @@
-from typing import override, ClassVar, Union
+import math
+import re
+from array import array
+from typing import override, Any, ClassVar, Iterable, Iterator, Optional, Union
 from abc import ABC
 from cocotb.handle import LogicObject, LogicArrayObject, HierarchyObject
 
+# Per-copy port names in a multi_instance_wrapper.py wrapper.
+INSTANCE_PORT_RE = re.compile(r"i\d+_")
+
 # ------------------------------------------------------------------
 #  Wrapper classes for cocotb objects
 # ------------------------------------------------------------------
@@ -13,6 +19,13 @@ class Module():
         assert type(dut) == HierarchyObject
         self._signals = {member._name : member for member in dut if isinstance(member, (LogicObject, LogicArrayObject))}
 
+    # Build from ready-made port handles, e.g. VerilatorModel.signals for the direct backend.
+    @classmethod
+    def from_signals(cls, signals: dict[str, Union[LogicObject, LogicArrayObject]]) -> "Module":
+        module = cls.__new__(cls)
+        module._signals = dict(signals)
+        return module
+
     def __getattr__(self, name: str) -> Union[LogicObject, LogicArrayObject]:
         return self._signals[name]
 
@@ -23,20 +36,31 @@ class Module():
     def signals(self) -> dict[str, Union[LogicObject, LogicArrayObject]]:
         return self._signals
 
+    # Ports of one copy in an sv_multi_instance wrapper under their original names, e.g.
+    # instance("i3_") maps i3_m_tdata_i to m_tdata_i. Shared ports (without an i<k>_ prefix)
+    # appear in every instance.
+    def instance(self, prefix: str) -> "Module":
+        shared = {name: handle for name, handle in self._signals.items() if not INSTANCE_PORT_RE.match(name)}
+        own = {name.removeprefix(prefix): handle for name, handle in self._signals.items() if name.startswith(prefix)}
+        if not own:
+            raise ValueError(f"No ports with prefix '{prefix}'")
+        return Module.from_signals(shared | own)
+
 
 class Bus(ABC):
     signals: ClassVar[tuple[str, ...]] = ()
+    optional_signals: ClassVar[tuple[str, ...]] = ()
     _signals: dict[str, Union[LogicObject, LogicArrayObject]]
 
     def __init__(self, module: Module, signals: dict[str, str]):
         if not self.signals:
             raise TypeError("Subclass must define 'signals' as a non-empty tuple of aliases")
 
-        required = set(self.signals)
+        required = set(self.signals) - set(self.optional_signals)
         actual = set(signals.keys())
-        if required != actual:
+        if not required <= actual <= set(self.signals):
             missing = sorted(required - actual)
-            extra = sorted(actual - required)
+            extra = sorted(actual - set(self.signals))
             raise ValueError(f"Signal map mismatch. missing: {missing} extra: {extra}")
 
         self._signals = {alias: module.signals[dut_name] for alias, dut_name in signals.items()}
@@ -47,12 +71,159 @@ class Bus(ABC):
     def __dir__(self):
         return sorted(self._signals.keys())
 
+    def has(self, alias: str) -> bool:
+        return alias in self._signals
+
+    # Current value of every signal, for diagnostics.
+    def snapshot(self) -> dict[str, Any]:
+        return {alias: handle.value for alias, handle in self._signals.items()}
+
 # ------------------------------------------------------------------
 #  Wrapper classes for basic data types to extend functionality
 # ------------------------------------------------------------------
 
 class Bytes(bytes):
+    # Simulation timestamps of the first and last beat, filled in by drivers and monitors.
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
 
     @override
     def __str__(self) -> str:
         return self.hex(" ").upper()
+
+
+# A bytes subclass cannot take __slots__, so every Bytes that gets timestamped also grows a
+# __dict__. Packet keeps the payload by reference in fixed slots instead; subclasses list their
+# sideband fields in both __slots__ and metadata. Packets compare on payload and metadata, and
+# against plain bytes on payload alone.
+class Packet:
+    __slots__ = ("data", "start_time", "end_time", "seq")
+    metadata: ClassVar[tuple[str, ...]] = ()
+
+    def __init__(self, data: bytes = b"", seq: Optional[int] = None, **metadata: int):
+        self.data = data
+        self.start_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+        self.seq = seq
+        for name in self.metadata:
+            setattr(self, name, metadata.pop(name, 0))
+        if metadata:
+            raise TypeError(f"Unknown {type(self).__name__} fields: {sorted(metadata)}")
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[int, bytes]:
+        return self.data[index]
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.data)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Packet):
+            return (
+                self.metadata == other.metadata
+                and self.data == other.data
+                and all(getattr(self, name) == getattr(other, name) for name in self.metadata)
+            )
+        if isinstance(other, (bytes, bytearray, memoryview)):
+            return self.data == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __str__(self) -> str:
+        fields = " ".join(f"{name}={getattr(self, name):#x}" for name in self.metadata)
+        data = bytes(self.data).hex(" ").upper()
+        return f"{fields} | {data}" if fields else data
+
+    def __repr__(self) -> str:
+        fields = "".join(f", {name}={getattr(self, name):#x}" for name in self.metadata)
+        return f"{type(self).__name__}({bytes(self.data)!r}{fields})"
+
+
+# One beat's worth of a packet from a streaming monitor (monitor_streaming), compared by the
+# scoreboard against the expected packet at offset so neither side holds the whole packet.
+class Fragment:
+    __slots__ = ("data", "offset", "last", "cycle", "start_time")
+
+    def __init__(self, data: bytes, offset: int, last: bool, cycle: float, start_time: Optional[float] = None):
+        self.data = data
+        self.offset = offset
+        self.last = last
+        self.cycle = cycle
+        self.start_time = start_time
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __str__(self) -> str:
+        return f"[{self.offset}:{self.offset + len(self.data)}]{' last' if self.last else ''} {self.data.hex(' ').upper()}"
+
+
+# Column store for large transaction sets: every payload in one bytearray, with offset, length,
+# timestamp and per-field metadata arrays alongside (metadata values must fit in 64 bits).
+# Iterating yields packet_type instances one at a time, so a batch can be handed straight to
+# BaseDriver.load_transaction_queue, and append() can serve as a monitor's receive_callback.
+class PacketBatch:
+    __slots__ = ("packet_type", "_payload", "_offsets", "_lengths", "_start_times", "_end_times", "_columns")
+
+    def __init__(self, packet_type: type[Packet] = Packet, packets: Iterable[Any] = ()):
+        self.packet_type = packet_type
+        self._payload = bytearray()
+        self._offsets = array("Q")
+        self._lengths = array("I")
+        self._start_times = array("d")
+        self._end_times = array("d")
+        self._columns: dict[str, array] = {name: array("Q") for name in packet_type.metadata}
+        self.extend(packets)
+
+    # Accepts Packets, Bytes or any bytes-like payload. Missing timestamps are stored as NaN.
+    def append(self, packet: Any) -> None:
+        data = packet.data if isinstance(packet, Packet) else packet
+        self._offsets.append(len(self._payload))
+        self._lengths.append(len(data))
+        self._payload += data
+
+        start_time = getattr(packet, "start_time", None)
+        end_time = getattr(packet, "end_time", None)
+        self._start_times.append(math.nan if start_time is None else start_time)
+        self._end_times.append(math.nan if end_time is None else end_time)
+        for name, column in self._columns.items():
+            column.append(getattr(packet, name, 0))
+
+    def extend(self, packets: Iterable[Any]) -> None:
+        for packet in packets:
+            self.append(packet)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def payload(self, index: int) -> bytes:
+        offset = self._offsets[index]
+        return bytes(self._payload[offset : offset + self._lengths[index]])
+
+    def column(self, name: str) -> array:
+        return self._columns[name]
+
+    def __getitem__(self, index: int) -> Packet:
+        index = range(len(self))[index]
+        packet = self.packet_type(
+            self.payload(index),
+            seq=index,
+            **{name: column[index] for name, column in self._columns.items()},
+        )
+        if not math.isnan(start_time := self._start_times[index]):
+            packet.start_time = start_time
+        if not math.isnan(end_time := self._end_times[index]):
+            packet.end_time = end_time
+        return packet
+
+    def __iter__(self) -> Iterator[Packet]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def nbytes(self) -> int:
+        columns = [self._offsets, self._lengths, self._start_times, self._end_times, *self._columns.values()]
+        return len(self._payload) + sum(column.itemsize * len(column) for column in columns)
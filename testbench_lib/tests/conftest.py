@@ -0,0 +1,14 @@
+import os
+import sys
+
+# testbench_lib modules import each other flat (from base_types import ...), as they do on the
+# PYTHONPATH the cocotb_test rule sets up.
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.dirname(_ROOT), os.path.join(_ROOT, "core"), os.path.join(_ROOT, "axi"), os.path.join(_ROOT, "verilator")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# qor_history.py imports compare.py from next to it, as it does when buck2 runs it.
+_SYNTH = os.path.join(os.path.dirname(_ROOT), "common_hdl_lib", "mux", "synth")
+if _SYNTH not in sys.path:
+    sys.path.insert(0, _SYNTH)
@@ -0,0 +1,59 @@
+import pytest
+
+from base_coverage import CoverageBins, save_coverage, load_coverage, merge_coverage_files
+
+
+def _group(name, hits, goal=1):
+    group = CoverageBins(name, list(hits), goal)
+    for bin_name, count in hits.items():
+        for _ in range(count):
+            group.hit(bin_name)
+    return group
+
+
+def test_closes_once_every_bin_reaches_goal():
+    group = _group("g", {"a": 2, "b": 1}, goal=2)
+    assert group.uncovered == ["b"]
+    assert not group.closed
+    assert group.percent == pytest.approx(50.0)
+
+    group.sample(group.index("b"))
+    assert group.closed
+    assert group.summary() == "100% (2/2 bins)"
+
+
+def test_merge_adds_hits_bin_by_bin():
+    group = _group("g", {"a": 1, "b": 0, "c": 3})
+    group.merge(_group("g", {"a": 2, "b": 1, "c": 0}))
+    assert [group.hits(name) for name in group.bins] == [3, 1, 3]
+    assert group.closed
+
+
+def test_merge_rejects_different_bin_sets():
+    with pytest.raises(ValueError, match="bin sets differ"):
+        _group("g", {"a": 1}).merge(_group("h", {"b": 1}))
+
+
+def test_save_load_round_trip(tmp_path):
+    path = tmp_path / "coverage.json"
+    save_coverage(path, [_group("driver", {"a": 1, "b": 0}, goal=4), _group("monitor", {"c": 5})])
+
+    loaded = load_coverage(path)
+    assert sorted(loaded) == ["driver", "monitor"]
+    assert loaded["driver"].goal == 4
+    assert loaded["driver"].bins == ("a", "b")
+    assert loaded["driver"].hits("a") == 1
+    assert loaded["monitor"].hits("c") == 5
+
+
+# Parallel runs each cover part of the space; the merged groups close only together.
+def test_merge_coverage_files_combines_parallel_runs(tmp_path):
+    paths = []
+    for k, hits in enumerate([{"a": 1, "b": 0}, {"a": 0, "b": 1}]):
+        path = tmp_path / f"run{k}.json"
+        save_coverage(path, [_group("driver", hits)])
+        paths.append(path)
+
+    merged = merge_coverage_files(paths)
+    assert merged["driver"].closed
+    assert not load_coverage(paths[0])["driver"].closed
@@ -0,0 +1,56 @@
+import struct
+
+import pytest
+
+from base_pcap import PCAP_MAGIC_NUMBER, PCAP_MAGIC_NUMBER_NS, read_pcap, pcap_replay
+from testbench_lib.core import BASE_CONFIG
+
+
+def _write_pcap(path, packets, magic=PCAP_MAGIC_NUMBER, endian="<"):
+    with open(path, "wb") as f:
+        f.write(struct.pack(f"{endian}IHHiIII", magic, 2, 4, 0, 0, 65535, 1))
+        for ts_sec, ts_frac, data in packets:
+            f.write(struct.pack(f"{endian}IIII", ts_sec, ts_frac, len(data), len(data)))
+            f.write(data)
+    return path
+
+
+@pytest.mark.parametrize("endian", ["<", ">"])
+def test_reads_either_byte_order(tmp_path, endian):
+    path = _write_pcap(tmp_path / "capture.pcap", [(1, 500, b"\x01\x02"), (2, 0, b"\x03")], endian=endian)
+
+    packets = list(read_pcap(path))
+    assert packets == [b"\x01\x02", b"\x03"]
+    assert packets[0].timestamp == pytest.approx(1.0005)
+    assert packets[1].timestamp == pytest.approx(2.0)
+
+
+def test_nanosecond_timestamps(tmp_path):
+    path = _write_pcap(tmp_path / "capture.pcap", [(0, 250, b"\x00")], magic=PCAP_MAGIC_NUMBER_NS)
+    assert next(read_pcap(path)).timestamp == pytest.approx(250e-9)
+
+
+def test_rejects_bad_magic_and_truncated_packets(tmp_path):
+    path = _write_pcap(tmp_path / "bad.pcap", [], magic=0x12345678)
+    with pytest.raises(ValueError, match="magic number"):
+        list(read_pcap(path))
+
+    path = _write_pcap(tmp_path / "truncated.pcap", [(0, 0, b"\x01\x02\x03\x04")])
+    with open(path, "r+b") as f:
+        f.truncate(path.stat().st_size - 2)
+    with pytest.raises(ValueError, match="Truncated PCAP packet"):
+        list(read_pcap(path))
+
+
+# At 10 Gb/s on a 64 bit bus a cycle is 6.4 ns, so 64 ns of capture time is 10 cycles.
+def test_replay_maps_capture_time_onto_cycles(tmp_path):
+    path = _write_pcap(
+        tmp_path / "capture.pcap",
+        [(5, 0, b"\x01"), (5, 64, b"\x02"), (5, 640, b"\x03")],
+        magic=PCAP_MAGIC_NUMBER_NS,
+    )
+    config = dict(BASE_CONFIG) | {"pcap_line_rate_bps": 10e9, "pcap_speedup": 1.0}
+    assert [packet.arrival_cycle for packet in pcap_replay(path, config, 64)] == [0, 10, 100]
+
+    config["pcap_speedup"] = 10.0
+    assert [packet.arrival_cycle for packet in pcap_replay(path, config, 64)] == [0, 1, 10]
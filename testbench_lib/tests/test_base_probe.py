@@ -0,0 +1,40 @@
+import pytest
+
+from base_probe import ProbeSet
+from base_statistics import set_time_source
+from testbench_lib.core import BASE_CONFIG
+
+
+class _Handle:
+
+    def __init__(self):
+        self.value = 0
+        self._path = "dut.flag"
+
+
+@pytest.fixture
+def cycle_time():
+    now = [0.0]
+    set_time_source(lambda: now[0])
+    yield now
+    set_time_source(None)
+
+
+# Rising edges sit half a period into each cycle; every one of them must count as its own cycle.
+def test_alternating_samples_give_half_duty(cycle_time):
+    handle = _Handle()
+    probe_set = ProbeSet(clock=None, root={"flag": handle})
+    probe = probe_set.add("flag", "flag")
+    probe_set.set_config(dict(BASE_CONFIG))
+
+    period = BASE_CONFIG["clock_period"]
+    for cycle in range(100):
+        cycle_time[0] = (cycle + 0.5) * period
+        handle.value = cycle % 2
+        probe_set._sample()
+    cycle_time[0] = 100.5 * period
+    probe_set.finish()
+
+    assert probe.duty(0) == pytest.approx(0.5)
+    assert probe.duty(1) == pytest.approx(0.5)
+    assert probe.mean == pytest.approx(0.5)
@@ -0,0 +1,199 @@
+from dataclasses import dataclass, field
+
+import pytest
+
+from base_driver import BaseDriver
+from base_scheduler import TickScheduler, DirectScheduler
+from testbench_lib.core import BASE_CONFIG
+
+
+class _Signal:
+
+    def __init__(self, width=1):
+        self.value = 0
+        self._width = width
+
+    def __len__(self):
+        return self._width
+
+
+# Stands in for VerilatorModel: counts stepped and free-run cycles, and raises the watched
+# signal at activity_cycle.
+class _Model:
+
+    def __init__(self, activity_cycle=None, signal=None):
+        self.cycle = 0
+        self.stepped = 0
+        self.free_run = []
+        self.activity_cycle = activity_cycle
+        self.signal = signal
+
+    def set_config(self, config):
+        pass
+
+    def rising_edge(self):
+        self.cycle += 1
+        self.stepped += 1
+        if self.signal is not None and self.cycle == self.activity_cycle:
+            self.signal.value = 1
+
+    def eval(self):
+        pass
+
+    def falling_edge(self):
+        pass
+
+    def run(self, cycles):
+        self.free_run.append(cycles)
+        self.cycle += cycles
+
+    def run_until_active(self, cycles, signals):
+        completed = min(cycles, self.activity_cycle - self.cycle - 1)
+        self.free_run.append(completed)
+        self.cycle += completed
+        if completed < cycles:
+            self.cycle += 1
+            self.signal.value = 1
+        return completed
+
+
+class _Component:
+
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+        self._scheduler = None
+
+    def tick_drive(self):
+        self.log.append((self._scheduler.cycle, self.name, "drive"))
+
+    def tick_sample(self):
+        self.log.append((self._scheduler.cycle, self.name, "sample"))
+
+
+@pytest.fixture
+def config():
+    return dict(BASE_CONFIG)
+
+
+def test_active_components_run_in_registration_order(config):
+    log = []
+    scheduler = TickScheduler(clock=None, config=config)
+    first, second = _Component("first", log), _Component("second", log)
+    scheduler.register(first)
+    scheduler.register(second)
+
+    scheduler.arm(second)
+    scheduler.arm(first)
+    scheduler.arm(first)
+    assert scheduler._active == [first, second]
+
+    scheduler.park(first)
+    assert scheduler._active == [second]
+
+
+def test_sleepers_wake_on_their_cycle(config):
+    scheduler = TickScheduler(clock=None, config=config)
+    early, late = _Component("early", []), _Component("late", [])
+    for component in (early, late):
+        scheduler.register(component)
+        scheduler.arm(component)
+
+    scheduler.sleep(late, 5)
+    scheduler.sleep(early, 2)
+    assert scheduler._active == []
+
+    woken = []
+    for cycle in range(1, 6):
+        scheduler._cycle = cycle
+        scheduler._wake_sleepers()
+        woken.append([component.name for component in scheduler._active])
+    assert woken == [[], ["early"], ["early"], ["early"], ["early", "late"]]
+
+
+def test_tick_scheduler_leaves_signal_wakeups_to_the_component(config):
+    scheduler = TickScheduler(clock=None, config=config)
+    component = _Component("monitor", [])
+    scheduler.register(component)
+    assert not scheduler.park_until_active(component, _Signal())
+
+
+def test_direct_scheduler_free_runs_up_to_the_next_sleeper(config):
+    log = []
+    model = _Model()
+    scheduler = DirectScheduler(model, config)
+    component = _Component("driver", log)
+    scheduler.register(component)
+    scheduler.sleep(component, 10)
+
+    scheduler.run(12)
+    assert model.free_run == [9]
+    assert [cycle for cycle, _, phase in log if phase == "drive"] == [10, 11, 12]
+    assert scheduler.cycle == 12
+
+
+def test_direct_scheduler_wakes_a_parked_watcher_in_its_cycle(config):
+    log = []
+    signal = _Signal()
+    model = _Model(activity_cycle=40, signal=signal)
+    scheduler = DirectScheduler(model, config)
+    monitor = _Component("monitor", log)
+    scheduler.register(monitor)
+
+    assert scheduler.park_until_active(monitor, signal)
+    scheduler.run(100)
+
+    # Free-runs up to the cycle tvalid rises, then dispatches it and every cycle after.
+    assert model.free_run[0] == 39
+    assert log[:2] == [(40, "monitor", "drive"), (40, "monitor", "sample")]
+    assert scheduler.cycle == 100
+
+
+def test_direct_scheduler_rejects_wide_watched_signals(config):
+    scheduler = DirectScheduler(_Model(), config)
+    component = _Component("monitor", [])
+    scheduler.register(component)
+    with pytest.raises(AssertionError):
+        scheduler.park_until_active(component, _Signal(width=128))
+
+
+@dataclass
+class _CountingDriver(BaseDriver):
+    started: list = field(default_factory=list)
+
+    def _begin_transaction(self, transaction):
+        self.started.append(transaction)
+
+    def _drive_cycle(self):
+        pass
+
+    def _sample_cycle(self):
+        return True
+
+    def _idle_bus(self):
+        pass
+
+
+# stop() while a transaction waits out its pre-delay drops it instead of sending one more.
+def test_stopped_driver_drops_the_transaction_waiting_on_its_gap(config):
+    config = config | {"driver_pre_delay_range": range(20, 20), "driver_post_delay_range": range(0, 0)}
+    scheduler = DirectScheduler(_Model(), config)
+    expected = []
+    driver = _CountingDriver(clock=None, port=None, expect_callback=expected.append)
+    scheduler.register(driver)
+    scheduler.start()
+    try:
+        driver.set_config(config)
+        driver.load_transaction_queue(range(10))
+        driver.start()
+
+        scheduler.run(30)
+        assert driver.started == [0]
+        driver.stop()
+        scheduler.run(30)
+    finally:
+        scheduler.stop()
+
+    assert driver.started == [0]
+    assert expected == [0]
+    assert not driver.running
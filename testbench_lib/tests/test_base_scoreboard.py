@@ -0,0 +1,99 @@
+import time
+from concurrent.futures import wait
+
+import cocotb
+import pytest
+
+from base_scoreboard import BaseScoreboard
+from base_types import Packet, Fragment
+from testbench_lib.core import BASE_CONFIG
+
+
+def _scoreboard(**config):
+    scoreboard = BaseScoreboard(lambda transaction: transaction)
+    scoreboard.set_config(dict(BASE_CONFIG) | config)
+    return scoreboard
+
+
+def _fragments(data, beat):
+    return [
+        Fragment(data[offset : offset + beat], offset, offset + beat >= len(data), cycle=offset // beat)
+        for offset in range(0, len(data), beat)
+    ]
+
+
+def test_streamed_fragments_match_the_expected_packet():
+    scoreboard = _scoreboard(scoreboard_expected_matches=2)
+    for data in (bytes(range(10)), b"\xFF"):
+        scoreboard.expect_transaction(Packet(data))
+
+    for fragment in _fragments(bytes(range(10)), 4):
+        scoreboard.receive_transaction(fragment)
+        assert scoreboard._num_received == int(fragment.last)
+    scoreboard.receive_transaction(Fragment(b"\xFF", 0, True, cycle=3))
+
+    scoreboard.check()
+    assert scoreboard.done and scoreboard.drained
+    assert scoreboard._num_received == 2
+
+
+def test_fragment_mismatch_reports_the_first_differing_byte():
+    scoreboard = _scoreboard()
+    scoreboard.expect_transaction(Packet(bytes(range(8))))
+    scoreboard.receive_transaction(Fragment(b"\x00\x01\x02\x03", 0, False, cycle=1))
+    scoreboard.receive_transaction(Fragment(b"\x04\x05\xAA\x07", 4, True, cycle=2))
+
+    with pytest.raises(ValueError, match="first difference at byte 6 at cycle 2"):
+        scoreboard.check()
+
+
+def test_fragment_ending_early_is_a_mismatch():
+    scoreboard = _scoreboard()
+    scoreboard.expect_transaction(Packet(bytes(range(8))))
+    scoreboard.receive_transaction(Fragment(bytes(range(4)), 0, True, cycle=1))
+
+    with pytest.raises(ValueError, match="packet ended at byte 4 at cycle 1, expected 8 bytes"):
+        scoreboard.check()
+
+
+def test_fragment_running_past_the_expected_packet_is_a_mismatch():
+    scoreboard = _scoreboard()
+    scoreboard.expect_transaction(Packet(bytes(range(6))))
+    scoreboard.receive_transaction(Fragment(bytes(range(4)), 0, False, cycle=1))
+    scoreboard.receive_transaction(Fragment(bytes(range(4, 8)), 4, True, cycle=2))
+
+    with pytest.raises(ValueError, match="received byte 6 at cycle 2 beyond the end of the expected 6 byte packet"):
+        scoreboard.check()
+
+
+# The model runs on worker threads; results that finish out of order still reach the expect
+# queue in expect order.
+def test_worker_results_are_matched_in_expect_order(monkeypatch):
+    monkeypatch.setattr(cocotb, "start_soon", lambda coroutine: coroutine.close())
+
+    def model(transaction):
+        time.sleep(0.05 if transaction[0] == 0 else 0)
+        return Packet(bytes(transaction[::-1]))
+
+    scoreboard = BaseScoreboard(model)
+    scoreboard.set_config(dict(BASE_CONFIG) | {
+        "scoreboard_expected_matches": 8,
+        "scoreboard_model_workers": 4,
+        "scoreboard_model_executor": "thread",
+        "scoreboard_model_batch_size": 1,
+    })
+    try:
+        transactions = [bytes([k, k + 1]) for k in range(8)]
+        for transaction in scoreboard.lookahead(transactions):
+            scoreboard.expect_transaction(transaction)
+        for transaction in transactions:
+            scoreboard.receive_transaction(Packet(transaction[::-1]))
+
+        wait([entry[0] for entry in scoreboard._pending])
+        scoreboard._collect()
+        scoreboard._resolve_queues()
+    finally:
+        scoreboard.close()
+
+    scoreboard.check()
+    assert scoreboard.done and scoreboard.drained
@@ -0,0 +1,62 @@
+import pytest
+
+from base_statistics import LatencyHistogram, ThroughputCounter, sim_cycle, set_time_source
+from base_scoreboard import BaseScoreboard
+from testbench_lib.core import BASE_CONFIG, Bytes
+
+
+def test_histogram_percentiles_and_overflow():
+    histogram = LatencyHistogram(num_bins=8)
+    for cycles in [1, 1, 2, 3, 3, 3, 20]:
+        histogram.record(cycles)
+
+    assert histogram.count == 7
+    assert histogram.min == 1 and histogram.max == 20
+    assert histogram.mean == pytest.approx(33 / 7)
+    assert histogram.percentile(50) == 3
+    # The overflow sample is beyond every bin.
+    assert histogram.percentile(100) == 8
+    assert "overflow=1" in histogram.summary()
+
+
+def test_throughput_counts_the_window_between_first_and_last_beat():
+    throughput = ThroughputCounter()
+    assert throughput.beats_per_cycle is None
+
+    for cycle in (10, 11, 13):
+        throughput.record_beat(cycle, 8)
+    assert throughput.cycles == 4
+    assert throughput.beats_per_cycle == pytest.approx(0.75)
+    assert throughput.bytes_per_cycle == pytest.approx(6.0)
+
+
+def test_sim_cycle_floors_edges_half_a_period_in():
+    config = dict(BASE_CONFIG)
+    now = [0.0]
+    set_time_source(lambda: now[0])
+    try:
+        cycles = []
+        for edge in range(4):
+            now[0] = (edge + 0.5) * config["clock_period"]
+            cycles.append(sim_cycle(config))
+    finally:
+        set_time_source(None)
+    assert cycles == [0, 1, 2, 3]
+
+
+# The driver stamps start_time on the first accepted beat, after the expect callback has run.
+def test_scoreboard_latency_reads_start_time_at_match():
+    config = dict(BASE_CONFIG)
+    scoreboard = BaseScoreboard(lambda transaction: transaction)
+    scoreboard.set_config(config)
+
+    sent = Bytes(b"\x01\x02")
+    scoreboard.expect_transaction(sent)
+    sent.start_time = 3 * config["clock_period"]
+
+    received = Bytes(b"\x01\x02")
+    received.start_time = 7 * config["clock_period"]
+    scoreboard.receive_transaction(received)
+
+    assert scoreboard.latency.count == 1
+    assert scoreboard.latency.min == 4
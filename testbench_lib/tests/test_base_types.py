@@ -0,0 +1,64 @@
+import pytest
+
+from base_types import Module, Packet, PacketBatch
+from axi4stream_packet import AXI4SPacket
+
+
+def test_packet_compares_on_payload_and_metadata():
+    assert AXI4SPacket(b"\x01\x02", tid=1) == AXI4SPacket(b"\x01\x02", tid=1)
+    assert AXI4SPacket(b"\x01\x02", tid=1) != AXI4SPacket(b"\x01\x02", tid=2)
+    assert AXI4SPacket(b"\x01\x02") != Packet(b"\x01\x02")
+    # Timestamps and sequence numbers are not part of the comparison.
+    stamped = Packet(b"\x01\x02", seq=7)
+    stamped.start_time = 10.0
+    assert stamped == Packet(b"\x01\x02")
+
+
+def test_packet_compares_against_plain_bytes_on_payload():
+    assert AXI4SPacket(b"\xAB", tdest=3) == b"\xAB"
+    assert Packet(b"\xAB") == bytearray(b"\xAB")
+    assert Packet(b"\xAB") != b"\xAC"
+
+
+def test_packet_rejects_unknown_fields():
+    with pytest.raises(TypeError, match="tkeep"):
+        AXI4SPacket(b"", tkeep=1)
+
+
+def test_packet_batch_round_trip():
+    packets = [AXI4SPacket(bytes(range(n)), tid=n, tuser=2 * n) for n in range(1, 5)]
+    packets[1].start_time = 3.0
+    packets[1].end_time = 9.0
+
+    batch = PacketBatch(AXI4SPacket, packets)
+    assert len(batch) == 4
+    assert list(batch) == packets
+    assert list(batch.column("tuser")) == [2, 4, 6, 8]
+    assert batch.payload(2) == bytes(range(3))
+
+    restored = batch[-3]
+    assert restored.seq == 1
+    assert (restored.start_time, restored.end_time) == (3.0, 9.0)
+    assert batch[0].start_time is None
+
+
+def test_packet_batch_accepts_plain_payloads():
+    batch = PacketBatch()
+    batch.append(b"\x01")
+    batch.append(bytearray(b"\x02\x03"))
+    assert [bytes(packet) for packet in batch] == [b"\x01", b"\x02\x03"]
+    assert batch.nbytes > 3
+
+
+def test_module_instance_maps_prefixed_ports_to_their_original_names():
+    module = Module.from_signals({
+        "clk_i": "clk",
+        "i0_s_tdata_i": "d0",
+        "i1_s_tdata_i": "d1",
+    })
+    assert module.clk_i == "clk"
+
+    copy = module.instance("i1_")
+    assert copy.signals == {"clk_i": "clk", "s_tdata_i": "d1"}
+    with pytest.raises(ValueError, match="i2_"):
+        module.instance("i2_")
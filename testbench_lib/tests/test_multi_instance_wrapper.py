@@ -0,0 +1,60 @@
+import pytest
+
+from multi_instance_wrapper import parse_module, generate
+
+SOURCE = """
+// Two beat pipeline stage.
+module stage #(
+    parameter int WIDTH = 8, // bits
+    parameter DEPTH = 2
+)(
+    input  logic                  clk_i,
+    input  logic                  rst_ni,
+    input  logic [WIDTH-1:0]      data_i,
+    output logic [WIDTH-1:0]      data_o [DEPTH],
+    /* handshake */
+    output wire                   valid_o
+);
+endmodule
+"""
+
+
+def test_parse_module_reads_parameters_and_ansi_ports():
+    parameters, ports = parse_module(SOURCE, "stage")
+    assert parameters == [("WIDTH", "8"), ("DEPTH", "2")]
+    assert ports == [
+        ("input", "logic", "", "clk_i", ""),
+        ("input", "logic", "", "rst_ni", ""),
+        ("input", "logic", "[WIDTH-1:0]", "data_i", ""),
+        ("output", "logic", "[WIDTH-1:0]", "data_o", "[DEPTH]"),
+        ("output", "wire", "", "valid_o", ""),
+    ]
+
+
+def test_parse_module_rejects_what_it_cannot_carry_over():
+    with pytest.raises(ValueError, match="not found"):
+        parse_module(SOURCE, "missing")
+    with pytest.raises(ValueError, match="Unsupported port declaration"):
+        parse_module("module m (input logic a, b);", "m")
+    with pytest.raises(ValueError, match="Unsupported port declaration"):
+        parse_module("module m (axi_if.slave bus);", "m")
+
+
+def test_generate_prefixes_every_copy_and_shares_the_clock():
+    parameters, ports = parse_module(SOURCE, "stage")
+    wrapper = generate("stage", 2, parameters, ports, {"clk_i"})
+
+    assert "module stage_x2 #(" in wrapper
+    assert "    parameter WIDTH = 8" in wrapper
+    assert "    input  logic clk_i" in wrapper
+    assert "    output logic [WIDTH-1:0] i1_data_o[DEPTH]" in wrapper
+    assert "    stage #(.WIDTH(WIDTH), .DEPTH(DEPTH)) i1 (" in wrapper
+    assert "        .clk_i(clk_i)," in wrapper
+    assert "        .rst_ni(i1_rst_ni)," in wrapper
+    assert "i2_" not in wrapper
+
+
+def test_generate_rejects_unknown_shared_ports():
+    parameters, ports = parse_module(SOURCE, "stage")
+    with pytest.raises(ValueError, match="rst_i"):
+        generate("stage", 2, parameters, ports, {"clk_i", "rst_i"})
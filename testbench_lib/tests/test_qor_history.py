@@ -0,0 +1,50 @@
+import pytest
+
+from qor_history import _connect, _history, _parse_thresholds, _regression, record, SLACK
+
+
+def _reports(tmp_path, luts, slack):
+    util = tmp_path / f"util_{luts}.rpt"
+    util.write_text(
+        "| Design : mux_top\n"
+        f"| Slice LUTs              | {luts:4d} |     0 |    53200 |  0.1 |\n"
+        "| Slice Registers         |   64 |     0 |   106400 |  0.1 |\n"
+    )
+    timing = tmp_path / f"timing_{luts}.rpt"
+    timing.write_text(f"Slack (MET) :  {slack}ns\n  Data Path Delay:  2.5ns\n  Logic Levels:  3\n")
+    return str(util), str(timing)
+
+
+def test_thresholds_default_and_override():
+    thresholds = _parse_thresholds(["Slice LUTs=10%", "Slack (ns)=0.2"])
+    assert thresholds["Slice LUTs"] == (10.0, True)
+    assert thresholds[SLACK] == (0.2, False)
+    assert thresholds["DSPs"] == (0.0, False)
+    with pytest.raises(SystemExit):
+        _parse_thresholds(["Slice LUTs"])
+
+
+def test_regression_respects_direction_and_limit():
+    thresholds = _parse_thresholds([])
+    assert _regression("Slice LUTs", 100, 102, thresholds) is None
+    assert _regression("Slice LUTs", 100, 103, thresholds) == "Slice LUTs: 100 -> 103"
+    assert _regression("Slice LUTs", 0, 1, thresholds) is not None
+    # Slack regresses when it shrinks.
+    assert _regression(SLACK, 1.0, 1.5, thresholds) is None
+    assert _regression(SLACK, 1.0, 0.9, thresholds) == "Slack (ns): 1 -> 0.9"
+    assert _regression("Unknown", 1, 100, thresholds) is None
+    assert _regression("Slice LUTs", None, 100, thresholds) is None
+
+
+# Re-recording a revision replaces its metrics without moving it behind later runs.
+def test_rerecording_a_revision_keeps_its_place(tmp_path):
+    db = _connect(str(tmp_path / "qor.db"))
+    record(db, "mux", *_reports(tmp_path, 100, 1.0), "xc7", {"WIDTH": "8"}, "rev1")
+    record(db, "mux", *_reports(tmp_path, 110, 0.8), "xc7", {"WIDTH": "8"}, "rev2")
+    record(db, "mux", *_reports(tmp_path, 105, 0.9), "xc7", {"WIDTH": "8"}, "rev1")
+
+    (runs,) = _history(db).values()
+    assert [run["revision"] for run in runs] == ["rev1", "rev2"]
+    assert runs[0]["metrics"]["Slice LUTs"] == 105
+    assert runs[0]["metrics"][SLACK] == 0.9
+    assert db.execute("SELECT COUNT(*) FROM metrics WHERE run_id NOT IN (SELECT id FROM runs)").fetchone() == (0,)
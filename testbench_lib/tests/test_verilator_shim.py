@@ -0,0 +1,43 @@
+import pytest
+
+from verilator_shim import parse_ports, generate
+
+VTOP_H = """
+class alignas(VL_CACHE_LINE_BYTES) Vtop VL_NOT_FINAL : public VerilatedModel {
+  public:
+    VL_IN8(&clk_i,0,0);
+    VL_IN8(&rst_ni,0,0);
+    VL_IN16(&s_tkeep_i,15,0);
+    VL_OUT64(&count_o,47,0);
+    VL_INW(&s_tdata_i,127,0,4);
+    VL_OUT8((&pkt_tdata_o)[8],7,0);
+    VL_OUT(&m_tdata_o,31,0);
+};
+"""
+
+
+def test_parse_ports_reads_width_and_direction():
+    assert parse_ports(VTOP_H) == [
+        ("clk_i", 1, False),
+        ("rst_ni", 1, False),
+        ("s_tkeep_i", 16, False),
+        ("count_o", 48, True),
+        ("s_tdata_i", 128, False),
+        ("m_tdata_o", 32, True),
+    ]
+
+
+def test_parse_ports_requires_at_least_one_port():
+    with pytest.raises(ValueError, match="No top level ports"):
+        parse_ports("VL_OUT8((&pkt_tdata_o)[8],7,0);")
+
+
+def test_generate_routes_wide_ports_through_word_arrays():
+    shim = generate(parse_ports(VTOP_H))
+    assert "int vtop_num_ports() { return 6; }" in shim
+    assert "case 4: for (int i = 0; i < 4; i++) words[i] = m->top->s_tdata_i[i]; break;" in shim
+    assert "case 4: return" not in shim
+    # Outputs are read only.
+    assert "m->top->count_o = value" not in shim
+    assert "case 0: m->top->clk_i = value; break;" in shim
+    assert "uint64_t vtop_run_until(void* handle, int clock, uint64_t cycles, uint64_t half_period, const int* watch, int num_watch)" in shim
@@ -0,0 +1 @@
+from verilator_model import VerilatorModel, DirectSignal, DirectValue
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""Generate a wrapper instantiating N independent copies of a module on shared clock (and optionally reset) ports.
+
+Usage: multi_instance_wrapper.py <source.sv> <module> <instances> <output.sv> [shared_port,...]
+
+Every other port of copy k is brought out as i<k>_<port>, so Module.instance("i<k>_") sees the
+original port names. Parameters are repeated on the wrapper and passed down to every copy.
+Ports must be ANSI declarations of plain net types with their own direction; packed and unpacked
+dimensions are carried over. Anything else (interfaces, user types, shared declarations such as
+"input logic a, b") is rejected rather than guessed at.
+"""
+
+import re
+import sys
+
+COMMENT_RE = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+PARAMETER_RE = re.compile(r"parameter\s+(?:(?:int|integer|logic|bit)\s+)?(?:\[[^\]]*\]\s*)?(\w+)\s*=\s*([^,]+)")
+PORT_RE = re.compile(r"(input|output|inout)\s+((?:(?:wire|logic|reg|bit|signed)\s+)*)((?:\[[^\]]*\]\s*)*)(\w+)\s*((?:\[[^\]]*\]\s*)*)")
+
+
+# Split on the commas separating declarations, not those inside brackets or parentheses.
+def _split_ports(text: str) -> list[str]:
+    entries, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        if char in "[(":
+            depth += 1
+        elif char in "])":
+            depth -= 1
+        elif char == "," and depth == 0:
+            entries.append(text[start:i])
+            start = i + 1
+    entries.append(text[start:])
+    return [" ".join(entry.split()) for entry in entries if entry.strip()]
+
+
+def parse_module(source: str, module: str) -> tuple[list[tuple[str, str]], list[tuple[str, str, str, str, str]]]:
+    source = COMMENT_RE.sub("", source)
+    header = re.search(rf"\bmodule\s+{module}\s*(#\s*\((?P<params>.*?)\)\s*)?\((?P<ports>.*?)\)\s*;", source, re.DOTALL)
+    if header is None:
+        raise ValueError(f"Module '{module}' with an ANSI port list not found")
+
+    parameters = [(name, value.strip()) for name, value in PARAMETER_RE.findall(header["params"] or "")]
+    ports = []
+    for entry in _split_ports(header["ports"]):
+        match = PORT_RE.fullmatch(entry)
+        if match is None:
+            raise ValueError(f"Unsupported port declaration '{entry}' on module '{module}'")
+        direction, kind, dims, name, unpacked = match.groups()
+        ports.append((direction, " ".join(kind.split()) or "logic", " ".join(dims.split()), name, " ".join(unpacked.split())))
+    if not ports:
+        raise ValueError(f"No ports found on module '{module}'")
+    return parameters, ports
+
+
+def generate(module: str, instances: int, parameters: list[tuple[str, str]], ports: list[tuple[str, str, str, str, str]], shared: set[str]) -> str:
+    unknown = shared - {port[3] for port in ports}
+    if unknown:
+        raise ValueError(f"Shared ports not on module '{module}': {sorted(unknown)}")
+
+    def declare(direction, kind, dims, name, unpacked):
+        return f"    {direction:<6} {kind} {dims + ' ' if dims else ''}{name}{unpacked}"
+
+    declarations = [declare(*port) for port in ports if port[3] in shared]
+    for k in range(instances):
+        declarations += [declare(d, t, w, f"i{k}_{name}", u) for d, t, w, name, u in ports if name not in shared]
+
+    lines = ["// Generated by multi_instance_wrapper.py, do not edit.", ""]
+    if parameters:
+        lines.append(f"module {module}_x{instances} #(")
+        lines.append(",\n".join(f"    parameter {name} = {value}" for name, value in parameters))
+        lines.append(")(")
+    else:
+        lines.append(f"module {module}_x{instances} (")
+    lines.append(",\n".join(declarations))
+    lines.append(");")
+
+    overrides = ", ".join(f".{name}({name})" for name, _ in parameters)
+    for k in range(instances):
+        connections = ",\n".join(
+            f"        .{name}({name if name in shared else f'i{k}_{name}'})" for _, _, _, name, _ in ports
+        )
+        lines.append("")
+        lines.append(f"    {module}{f' #({overrides})' if overrides else ''} i{k} (")
+        lines.append(connections)
+        lines.append("    );")
+
+    lines.append("")
+    lines.append("endmodule")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    if len(sys.argv) not in (5, 6):
+        sys.exit("usage: multi_instance_wrapper.py <source.sv> <module> <instances> <output.sv> [shared_port,...]")
+
+    source, module, instances, output = sys.argv[1:5]
+    shared = set(filter(None, sys.argv[5].split(","))) if len(sys.argv) == 6 else {"clk_i"}
+    with open(source) as f:
+        parameters, ports = parse_module(f.read(), module)
+    with open(output, "w") as f:
+        f.write(generate(module, int(instances), parameters, ports, shared))
+
+
+if __name__ == "__main__":
+    main()
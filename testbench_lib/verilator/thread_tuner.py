@@ -0,0 +1,128 @@
+"""Build a Verilator model at several --threads settings, time a cocotb test against each and record the fastest.
+
+Usage: thread_tuner.py <model_target> <test_target> [threads ...] [--clock-period NS] [--config FILE] [--dry-run]
+
+Each setting is passed to the build as -c verilator_threads.<key>=N, the test target's results.xml
+gives simulated time and wall time per test, and the best setting is written to the
+[verilator_threads] section of buck2/verilator_threads.buckconfig, which the verilator_model macro
+reads when the target does not set threads itself. Threads default to 1 2 4 8.
+"""
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+import xml.etree.ElementTree as ET
+
+DEFAULT_THREADS = [1, 2, 4, 8]
+DEFAULT_CONFIG = os.path.join("buck2", "verilator_threads.buckconfig")
+SECTION = "verilator_threads"
+
+_TARGET_RE = re.compile(r"^(?:\w*//)?(?P<package>[^:]*):(?P<name>[^:]+)$")
+
+
+# Matches verilator_threads_key in buck2/verilator_sim.bzl.
+def config_key(target: str) -> str:
+    match = _TARGET_RE.match(target)
+    if match is None:
+        raise ValueError(f"Expected a //package:name target, got '{target}'")
+    return f"{match['package'].replace('/', '.')}.{match['name']}"
+
+
+def _results_path(test_target: str, key: str, threads: int) -> str:
+    command = ["buck2", "build", test_target, "-c", f"{SECTION}.{key}={threads}", "--show-full-output"]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.stderr.write(result.stdout + result.stderr)
+        raise RuntimeError(f"{test_target} failed with --threads {threads}")
+    # "<target> <absolute path to results.xml>"
+    return result.stdout.strip().splitlines()[-1].split(maxsplit=1)[1]
+
+
+# Simulated ns and wall seconds summed over the test cases in a cocotb results.xml.
+def parse_results(path: str) -> tuple[float, float]:
+    sim_time_ns = wall_seconds = 0.0
+    for testcase in ET.parse(path).getroot().iter("testcase"):
+        if testcase.find("failure") is not None or testcase.find("error") is not None:
+            raise RuntimeError(f"{testcase.get('name')} failed in {path}")
+        sim_time_ns += float(testcase.get("sim_time_ns", 0))
+        wall_seconds += float(testcase.get("time", 0))
+    if sim_time_ns == 0 or wall_seconds == 0:
+        raise RuntimeError(f"No timed test cases in {path}")
+    return sim_time_ns, wall_seconds
+
+
+def measure(test_target: str, key: str, threads: int, clock_period_ns: float) -> float:
+    sim_time_ns, wall_seconds = parse_results(_results_path(test_target, key, threads))
+    return sim_time_ns / clock_period_ns / wall_seconds
+
+
+# Replaces or adds key in [verilator_threads], leaving the rest of the file alone.
+def write_setting(path: str, key: str, threads: int) -> None:
+    lines = []
+    if os.path.exists(path):
+        with open(path) as f:
+            lines = f.read().splitlines()
+
+    section = None
+    start = end = None
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith("[") and stripped.endswith("]"):
+            section = stripped[1:-1].strip()
+            if section == SECTION:
+                start = end = i + 1
+            continue
+        if section != SECTION:
+            continue
+        if stripped and not stripped.startswith("#"):
+            end = i + 1
+            name = stripped.partition("=")[0].strip()
+            if name == key:
+                lines[i] = f"  {key} = {threads}"
+                break
+    else:
+        if start is None:
+            lines += ["", f"[{SECTION}]"] if lines else [f"[{SECTION}]"]
+            end = len(lines)
+        lines.insert(end, f"  {key} = {threads}")
+
+    with open(path + ".tmp", "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(path + ".tmp", path)
+
+
+def main():
+    parser = argparse.ArgumentParser(usage=__doc__)
+    parser.add_argument("model_target")
+    parser.add_argument("test_target")
+    parser.add_argument("threads", nargs="*", type=int, default=DEFAULT_THREADS)
+    parser.add_argument("--clock-period", type=float, default=10.0, help="testbench clock period in ns")
+    parser.add_argument("--config", default=DEFAULT_CONFIG)
+    parser.add_argument("--dry-run", action="store_true", help="report without recording the best setting")
+    args = parser.parse_args()
+
+    key = config_key(args.model_target)
+    rates = {}
+    for threads in args.threads:
+        try:
+            rates[threads] = measure(args.test_target, key, threads, args.clock_period)
+        except RuntimeError as error:
+            print(f"threads={threads:<3}  {error}")
+            continue
+        print(f"threads={threads:<3}  {rates[threads]:12.0f} cycles/s")
+
+    if not rates:
+        sys.exit("No thread count produced a passing run")
+
+    best = max(rates, key=rates.get)
+    speedup = rates[best] / rates[min(rates)]
+    print(f"best: threads={best} ({speedup:.2f}x threads={min(rates)})")
+    if not args.dry_run:
+        write_setting(args.config, key, best)
+        print(f"recorded {SECTION}.{key} = {best} in {args.config}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import ctypes
+from typing import Any
+
+from testbench_lib.core import Module
+
+# ------------------------------------------------------------------
+#  In-process Verilator model, see verilator_shim.py
+# ------------------------------------------------------------------
+
+# Model time precision, matches the --timescale given by the verilator_model rule.
+MODEL_PRECISION = 1e-12
+TIMESCALE_SECONDS = {"fs": 1e-15, "ps": 1e-12, "ns": 1e-9, "us": 1e-6, "ms": 1e-3, "s": 1.0}
+
+# Stands in for the cocotb LogicArray read from a handle. Direct port values are never X/Z,
+# so a plain integer that also answers to_unsigned()/to_bytes() is enough for the components.
+class DirectValue(int):
+    width: int = 1
+
+    def to_unsigned(self) -> int:
+        return int(self)
+
+    def to_bytes(self, length: int = None, byteorder: str = "big") -> bytes:
+        return int.to_bytes(self, length or (self.width + 7) // 8, byteorder)
+
+
+# Stands in for a cocotb LogicObject/LogicArrayObject on a top level port. Writes go straight
+# into the model and are seen by the next eval().
+class DirectSignal:
+
+    def __init__(self, model: "VerilatorModel", port: int, name: str, width: int, output: bool):
+        self._model: VerilatorModel = model
+        self._port: int = port
+        self._name: str = name
+        self._path: str = f"TOP.{name}"
+        self._width: int = width
+        self._output: bool = output
+        self._words = (ctypes.c_uint32 * ((width + 31) // 32))() if width > 64 else None
+
+    def __len__(self) -> int:
+        return self._width
+
+    @property
+    def value(self) -> DirectValue:
+        lib, handle = self._model._lib, self._model._handle
+        if self._words is None:
+            value = DirectValue(lib.vtop_get(handle, self._port))
+        else:
+            lib.vtop_get_wide(handle, self._port, self._words)
+            value = DirectValue(sum(word << (32 * i) for i, word in enumerate(self._words)))
+        value.width = self._width
+        return value
+
+    @value.setter
+    def value(self, value: Any) -> None:
+        if self._output:
+            raise TypeError(f"Port {self._name} is an output")
+        value = int(value)
+        lib, handle = self._model._lib, self._model._handle
+        if self._words is None:
+            lib.vtop_set(handle, self._port, value)
+        else:
+            for i in range(len(self._words)):
+                self._words[i] = (value >> (32 * i)) & 0xFFFFFFFF
+            lib.vtop_set_wide(handle, self._port, self._words)
+
+    # Accepts cocotb's Immediate/Deposit wrappers, there is no scheduling to bypass here.
+    def set(self, value: Any) -> None:
+        self.value = getattr(value, "value", value)
+
+
+# A Verilated model loaded from the shared library built by verilator_shared_model. Each cycle
+# is split into rising_edge() / eval() / falling_edge() so the tick hooks can run in between,
+# and run() steps free-running cycles in a single call.
+class VerilatorModel:
+
+    def __init__(self, lib_path: str, clock: str = "clk_i"):
+        self._lib = ctypes.CDLL(lib_path)
+        self._declare()
+        self._handle = self._lib.vtop_new()
+        self._half_period: int = 1
+
+        self._signals: dict[str, DirectSignal] = {}
+        for port in range(self._lib.vtop_num_ports()):
+            name = self._lib.vtop_port_name(port).decode()
+            width = self._lib.vtop_port_width(port)
+            self._signals[name] = DirectSignal(self, port, name, width, bool(self._lib.vtop_port_output(port)))
+
+        if clock not in self._signals:
+            raise ValueError(f"Clock port '{clock}' not found, model ports: {sorted(self._signals)}")
+        self._clock: DirectSignal = self._signals[clock]
+
+    def _declare(self) -> None:
+        lib = self._lib
+        handle, port, u64 = ctypes.c_void_p, ctypes.c_int, ctypes.c_uint64
+        words = ctypes.POINTER(ctypes.c_uint32)
+        signatures = {
+            "vtop_new":         ([], handle),
+            "vtop_delete":      ([handle], None),
+            "vtop_eval":        ([handle], None),
+            "vtop_num_ports":   ([], ctypes.c_int),
+            "vtop_port_name":   ([port], ctypes.c_char_p),
+            "vtop_port_width":  ([port], ctypes.c_int),
+            "vtop_port_output": ([port], ctypes.c_int),
+            "vtop_get":         ([handle, port], u64),
+            "vtop_set":         ([handle, port, u64], None),
+            "vtop_get_wide":    ([handle, port, words], None),
+            "vtop_set_wide":    ([handle, port, words], None),
+            "vtop_run":         ([handle, port, u64, u64], None),
+            "vtop_run_until":   ([handle, port, u64, u64, ctypes.POINTER(ctypes.c_int), ctypes.c_int], u64),
+            "vtop_time_inc":    ([handle, u64], None),
+        }
+        for name, (argtypes, restype) in signatures.items():
+            function = getattr(lib, name)
+            function.argtypes = argtypes
+            function.restype = restype
+
+    @property
+    def signals(self) -> dict[str, DirectSignal]:
+        return self._signals
+
+    @property
+    def clock(self) -> DirectSignal:
+        return self._clock
+
+    def module(self) -> Module:
+        return Module.from_signals(self._signals)
+
+    def set_config(self, config: dict[str, Any]) -> None:
+        period = config["clock_period"] * TIMESCALE_SECONDS[config["timescale"]]
+        self._half_period = max(round(period / MODEL_PRECISION / 2), 1)
+
+    def eval(self) -> None:
+        self._lib.vtop_eval(self._handle)
+
+    def rising_edge(self) -> None:
+        self._lib.vtop_set(self._handle, self._clock._port, 1)
+        self._lib.vtop_eval(self._handle)
+
+    def falling_edge(self) -> None:
+        self._lib.vtop_time_inc(self._handle, self._half_period)
+        self._lib.vtop_set(self._handle, self._clock._port, 0)
+        self._lib.vtop_eval(self._handle)
+        self._lib.vtop_time_inc(self._handle, self._half_period)
+
+    def run(self, cycles: int) -> None:
+        if cycles > 0:
+            self._lib.vtop_run(self._handle, self._clock._port, cycles, self._half_period)
+
+    # Free-runs up to cycles cycles, stopping just after the rising edge of the first cycle in
+    # which any of signals reads non-zero. Returns the number of cycles completed before it, so a
+    # result below cycles leaves the model inside that cycle with the clock high.
+    def run_until_active(self, cycles: int, signals: list[DirectSignal]) -> int:
+        if cycles <= 0:
+            return 0
+        ports = (ctypes.c_int * len(signals))(*(signal._port for signal in signals))
+        return self._lib.vtop_run_until(self._handle, self._clock._port, cycles, self._half_period, ports, len(signals))
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._lib.vtop_delete(self._handle)
+            self._handle = None
+
+    # Closes the model, and with it the trace file, however the run ends.
+    def __enter__(self) -> "VerilatorModel":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,145 @@
+"""Generate a C ABI shim over a Verilated Vtop model, loaded in-process by verilator_model.py.
+
+Usage: verilator_shim.py <Vtop.h> <output.cpp>
+"""
+
+import re
+import sys
+
+# Top level ports as declared in Vtop.h, e.g. "VL_IN8(&clk_i,0,0);" or "VL_OUTW(&tdata,127,0,4);".
+# Unpacked array ports ("VL_OUT8((&pkt_tdata_o)[8],7,0);") do not match and are not exposed.
+PORT_RE = re.compile(r"VL_(IN|OUT|INOUT)(8|16|64|W)?\(&(\w+),(\d+),(\d+)(?:,(\d+))?\);")
+
+HEADER = """\
+// Generated by verilator_shim.py, do not edit.
+#include <cstdint>
+#include "verilated.h"
+#include "Vtop.h"
+
+struct Model {
+    VerilatedContext context;
+    Vtop* top;
+    Model() : top(new Vtop(&context, "TOP")) {}
+    ~Model() { top->final(); delete top; }
+};
+
+struct Port {
+    const char* name;
+    int width;
+    int output;
+};
+"""
+
+def parse_ports(header: str) -> list[tuple[str, int, bool]]:
+    ports = []
+    for direction, _, name, msb, lsb, _ in PORT_RE.findall(header):
+        ports.append((name, int(msb) - int(lsb) + 1, direction == "OUT"))
+    if not ports:
+        raise ValueError("No top level ports found in Vtop.h")
+    return ports
+
+
+def generate(ports: list[tuple[str, int, bool]]) -> str:
+    table = ",\n".join(f'    {{"{name}", {width}, {int(output)}}}' for name, width, output in ports)
+
+    get_cases, set_cases, get_wide_cases, set_wide_cases = [], [], [], []
+    for idx, (name, width, output) in enumerate(ports):
+        if width <= 64:
+            get_cases.append(f"        case {idx}: return m->top->{name};")
+            if not output:
+                set_cases.append(f"        case {idx}: m->top->{name} = value; break;")
+        else:
+            words = (width + 31) // 32
+            get_wide_cases.append(f"        case {idx}: for (int i = 0; i < {words}; i++) words[i] = m->top->{name}[i]; break;")
+            if not output:
+                set_wide_cases.append(f"        case {idx}: for (int i = 0; i < {words}; i++) m->top->{name}[i] = words[i]; break;")
+
+    def switch(cases: list[str], default: str) -> str:
+        return "\n".join(["    switch (port) {"] + cases + [f"        default: {default}", "    }"])
+
+    return f"""{HEADER}
+static const Port PORTS[] = {{
+{table}
+}};
+
+extern "C" {{
+
+void* vtop_new() {{ return new Model(); }}
+void vtop_delete(void* handle) {{ delete static_cast<Model*>(handle); }}
+void vtop_eval(void* handle) {{ static_cast<Model*>(handle)->top->eval(); }}
+
+int vtop_num_ports() {{ return {len(ports)}; }}
+const char* vtop_port_name(int port) {{ return PORTS[port].name; }}
+int vtop_port_width(int port) {{ return PORTS[port].width; }}
+int vtop_port_output(int port) {{ return PORTS[port].output; }}
+
+uint64_t vtop_get(void* handle, int port) {{
+    Model* m = static_cast<Model*>(handle);
+{switch(get_cases, "return 0;")}
+}}
+
+void vtop_set(void* handle, int port, uint64_t value) {{
+    Model* m = static_cast<Model*>(handle);
+{switch(set_cases, "break;")}
+}}
+
+void vtop_get_wide(void* handle, int port, uint32_t* words) {{
+    Model* m = static_cast<Model*>(handle);
+{switch(get_wide_cases, "break;")}
+}}
+
+void vtop_set_wide(void* handle, int port, const uint32_t* words) {{
+    Model* m = static_cast<Model*>(handle);
+{switch(set_wide_cases, "break;")}
+}}
+
+// Free running cycles with no per-cycle call back into Python.
+void vtop_run(void* handle, int clock, uint64_t cycles, uint64_t half_period) {{
+    Model* m = static_cast<Model*>(handle);
+    for (uint64_t i = 0; i < cycles; i++) {{
+        vtop_set(handle, clock, 1);
+        m->top->eval();
+        m->context.timeInc(half_period);
+        vtop_set(handle, clock, 0);
+        m->top->eval();
+        m->context.timeInc(half_period);
+    }}
+}}
+
+// As vtop_run, but stops just after the rising edge of the first cycle in which any of the
+// watched ports reads non-zero, returning the number of cycles completed before it.
+uint64_t vtop_run_until(void* handle, int clock, uint64_t cycles, uint64_t half_period, const int* watch, int num_watch) {{
+    Model* m = static_cast<Model*>(handle);
+    for (uint64_t i = 0; i < cycles; i++) {{
+        vtop_set(handle, clock, 1);
+        m->top->eval();
+        for (int w = 0; w < num_watch; w++) {{
+            if (vtop_get(handle, watch[w])) return i;
+        }}
+        m->context.timeInc(half_period);
+        vtop_set(handle, clock, 0);
+        m->top->eval();
+        m->context.timeInc(half_period);
+    }}
+    return cycles;
+}}
+
+void vtop_time_inc(void* handle, uint64_t ticks) {{ static_cast<Model*>(handle)->context.timeInc(ticks); }}
+
+}}
+"""
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit("usage: verilator_shim.py <Vtop.h> <output.cpp>")
+
+    header, output = sys.argv[1:]
+    with open(header) as f:
+        ports = parse_ports(f.read())
+    with open(output, "w") as f:
+        f.write(generate(ports))
+
+
+if __name__ == "__main__":
+    main()
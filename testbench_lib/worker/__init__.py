@@ -0,0 +1 @@
+from worker_client import submit_job, wait_result, stop_worker
@@ -0,0 +1,139 @@
+import os
+import sys
+import json
+import time
+import random
+import logging
+import importlib
+import traceback
+from typing import Any, Callable
+
+import cocotb
+from cocotb.triggers import with_timeout, SimTimeoutError
+from cocotb.utils import get_sim_time
+
+from testbench_lib.core import BASE_CONFIG, set_time_source
+
+# ------------------------------------------------------------------
+#  Persistent simulator worker, see the cocotb_worker rule
+# ------------------------------------------------------------------
+#
+# Loaded as the cocotb test module of a simulator that stays up between tests. Jobs are JSON
+# files dropped into <spool>/queue by worker_client.py and run in name order:
+#
+#   {"id": "...", "module": "axi4s_skid_buffer_tb", "test": "test",
+#    "params": {"master_stall_probability": 0.1}, "seed": 1, "timeout_cycles": 1000000}
+#
+# Each job's result is written to <spool>/results/<id>.json. A job file named stop.json ends
+# the worker. Between jobs the environment's stop() has cancelled its clock and component tasks
+# and the next job's reset sequence brings the DUT back to a known state; the test module is
+# re-imported when its source changes so testbench edits are picked up without a restart.
+
+log = logging.getLogger("cocotb.worker")
+
+POLL_SECONDS = 0.1
+
+def _spool_dirs(spool: str) -> tuple[str, str]:
+    queue = os.path.join(spool, "queue")
+    results = os.path.join(spool, "results")
+    os.makedirs(queue, exist_ok=True)
+    os.makedirs(results, exist_ok=True)
+    return queue, results
+
+
+# Blocks the whole simulator, which has nothing else to do between jobs.
+def _next_job(queue: str) -> dict[str, Any]:
+    while True:
+        names = sorted(name for name in os.listdir(queue) if name.endswith(".json"))
+        if names:
+            path = os.path.join(queue, names[0])
+            with open(path) as f:
+                job = json.load(f)
+            os.remove(path)
+            job.setdefault("id", names[0].removesuffix(".json"))
+            return job
+        time.sleep(POLL_SECONDS)
+
+
+_module_mtimes: dict[str, float] = {}
+
+def _load_module(name: str) -> Any:
+    module = sys.modules.get(name)
+    if module is None:
+        module = importlib.import_module(name)
+    elif os.path.getmtime(module.__file__) != _module_mtimes.get(name):
+        module = importlib.reload(module)
+    _module_mtimes[name] = os.path.getmtime(module.__file__)
+    return module
+
+
+# The cocotb decorators wrap the test coroutine function; call the function itself.
+def _test_function(module: Any, name: str) -> Callable:
+    test = getattr(module, name)
+    while hasattr(test, "func"):
+        test = test.func
+    return getattr(test, "__wrapped__", test)
+
+
+def _write_result(results: str, result: dict[str, Any]) -> None:
+    path = os.path.join(results, f"{result['id']}.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(result, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+async def _run_job(dut: Any, job: dict[str, Any]) -> dict[str, Any]:
+    seed = job.get("seed", random.randrange(2**32))
+    timeout_cycles = job.get("timeout_cycles", BASE_CONFIG["timeout_cycles"])
+    result = {
+        "id": job["id"],
+        "module": job["module"],
+        "test": job.get("test", "test"),
+        "params": job.get("params", {}),
+        "seed": seed,
+    }
+
+    wall_start = time.perf_counter()
+    sim_start = get_sim_time(BASE_CONFIG["timescale"])
+    task = None
+    try:
+        test = _test_function(_load_module(job["module"]), result["test"])
+        random.seed(seed)
+        set_time_source(None)
+        task = cocotb.start_soon(test(dut, **result["params"]))
+        await with_timeout(task, timeout_cycles * BASE_CONFIG["clock_period"], BASE_CONFIG["timescale"])
+        result["status"] = "pass"
+    except SimTimeoutError:
+        # Cancelling unwinds the test through BaseEnvironment.run, which stops its tasks.
+        task.cancel()
+        result["status"] = "fail"
+        result["error"] = f"Timed out after {timeout_cycles} cycles"
+    except Exception as error:
+        result["status"] = "fail"
+        result["error"] = f"{type(error).__name__}: {error}"
+        result["traceback"] = traceback.format_exc()
+
+    result["wall_seconds"] = time.perf_counter() - wall_start
+    result["sim_time"] = get_sim_time(BASE_CONFIG["timescale"]) - sim_start
+    result["timescale"] = BASE_CONFIG["timescale"]
+    return result
+
+
+@cocotb.test()
+async def worker(dut):
+    spool = os.environ.get("COCOTB_WORKER_SPOOL", ".cocotb_worker")
+    queue, results = _spool_dirs(spool)
+    log.info(f"Waiting for jobs in {queue}")
+
+    while True:
+        job = _next_job(queue)
+        if job["id"] == "stop":
+            log.info("Stopping")
+            return
+        if "module" not in job:
+            _write_result(results, {"id": job["id"], "status": "fail", "error": "Job has no module"})
+            continue
+
+        result = await _run_job(dut, job)
+        log.info(f"{result['id']}: {result['status']} in {result['wall_seconds']:.2f}s {result.get('error', '')}")
+        _write_result(results, result)
@@ -0,0 +1,109 @@
+"""Queue tests on a running cocotb_worker and collect their results.
+
+Usage: worker_client.py <spool> run <module> [--test NAME] [--seed N] [--timeout-cycles N] [name=v1,v2 ...]
+       worker_client.py <spool> stop
+
+Each name=v1,v2 multiplies the jobs by its values, so
+    worker_client.py .cocotb_worker run axi4s_skid_buffer_tb master_stall_probability=0,0.1,0.95 slave_stall_probability=0,0.1,0.95
+queues the nine cells of the stall grid, waits for them and exits non-zero if any failed.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import itertools
+from typing import Any, Optional
+
+
+def _write_job(spool: str, job: dict[str, Any]) -> None:
+    queue = os.path.join(spool, "queue")
+    os.makedirs(queue, exist_ok=True)
+    path = os.path.join(queue, f"{job['id']}.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(job, f)
+    os.replace(path + ".tmp", path)
+
+
+# Ids sort in submission order, which is the order the worker runs them in. The uuid keeps
+# them unique across clients submitting to the same spool in the same nanosecond.
+def submit_job(spool: str, module: str, test: str = "test", params: Optional[dict[str, Any]] = None,
+               seed: Optional[int] = None, timeout_cycles: Optional[int] = None) -> str:
+    job = {"id": f"{time.time_ns():020d}-{uuid.uuid4().hex}", "module": module, "test": test, "params": params or {}}
+    if seed is not None:
+        job["seed"] = seed
+    if timeout_cycles is not None:
+        job["timeout_cycles"] = timeout_cycles
+    _write_job(spool, job)
+    return job["id"]
+
+
+def wait_result(spool: str, job_id: str, poll_seconds: float = 0.1) -> dict[str, Any]:
+    path = os.path.join(spool, "results", f"{job_id}.json")
+    while not os.path.exists(path):
+        time.sleep(poll_seconds)
+    with open(path) as f:
+        return json.load(f)
+
+
+def stop_worker(spool: str) -> None:
+    _write_job(spool, {"id": "stop"})
+
+
+def _parse_value(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def _param_grid(assignments: list[str]) -> list[dict[str, Any]]:
+    names, values = [], []
+    for assignment in assignments:
+        name, _, text = assignment.partition("=")
+        if not name or not text:
+            sys.exit(f"Expected name=value, got '{assignment}'")
+        names.append(name)
+        values.append([_parse_value(value) for value in text.split(",")])
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+
+def main():
+    parser = argparse.ArgumentParser(usage=__doc__)
+    parser.add_argument("spool")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run")
+    run.add_argument("module")
+    run.add_argument("params", nargs="*")
+    run.add_argument("--test", default="test")
+    run.add_argument("--seed", type=int)
+    run.add_argument("--timeout-cycles", type=int)
+    commands.add_parser("stop")
+    args = parser.parse_args()
+
+    if args.command == "stop":
+        stop_worker(args.spool)
+        return
+
+    job_ids = [
+        submit_job(args.spool, args.module, args.test, params, args.seed, args.timeout_cycles)
+        for params in _param_grid(args.params)
+    ]
+
+    failed = 0
+    for job_id in job_ids:
+        result = wait_result(args.spool, job_id)
+        params = " ".join(f"{name}={value}" for name, value in result.get("params", {}).items())
+        print(f"{result['status'].upper():4}  {result.get('wall_seconds', 0):7.2f}s  seed={result.get('seed')}  {params}")
+        if result["status"] != "pass":
+            failed += 1
+            print(result.get("traceback") or result.get("error", ""))
+
+    print(f"{len(job_ids) - failed}/{len(job_ids)} passed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()